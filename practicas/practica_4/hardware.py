@@ -127,6 +127,14 @@ class Memory():
     def read(self, addr):
         return self._cells[addr]
 
+    ## escribe un bloque de celdas consecutivas con una sola asignacion
+    def write_block(self, addr, values):
+        self._cells[addr:addr + len(values)] = values
+
+    ## devuelve una copia de size celdas a partir de addr
+    def read_block(self, addr, size):
+        return self._cells[addr:addr + size]
+
     @property
     def size(self):
         return self._size
@@ -1,13 +1,31 @@
 #!/usr/bin/env python
 
 from hardware import *
+from array import array
+from collections import deque
+from collections.abc import Mapping
+import heapq
+import random
+import csv
+import json
 import log
 
+try:
+    import numpy
+except ImportError:
+    ## numpy es opcional: solo lo usa PCBTablaColumnar para las consultas masivas
+    numpy = None
+
 RUNNING= 'RUNNING'
 TERMINATED= 'TERMINATED'
 WAITING= 'WAITING'
 NEW= 'NEW'
 READY = 'READY'
+## formatos de ExportadorDeEventos
+EXPORTAR_CSV = 'csv'
+EXPORTAR_JSONL = 'jsonl'
+## el codigo de cada estado es su posicion en ESTADOS
+ESTADOS = (NEW, READY, RUNNING, WAITING, TERMINATED)
 
 
 ## emulates a compiled program
@@ -127,14 +145,20 @@ class KillInterruptionHandler(AbstractInterruptionHandler):
             procesosCorriendo = self.kernel.pcbTable.pcbEnRunning()
             procesosCorriendo.state = TERMINATED
             self.kernel.dispatcher.save(procesosCorriendo)
+            ## devolvemos la memoria que ocupaba el programa
+            self.kernel.memoryManager.free(procesosCorriendo.baseDir, procesosCorriendo.size)
+            self.kernel.compactador.compactarSiHaceFalta()
 
-        if len(self.kernel.schaduler.hayElementosEnReadyQueve()) >= 1:
+        if self.kernel.schaduler.hayElementosEnReadyQueve():
 
             next_pcb = self.kernel.schaduler.next()
             self.kernel.dispatcher.load(next_pcb)
         elif self.kernel.pcbTable.todosLosProcesosTerminaron():
             HARDWARE.switchOff()
-            log.logger.info("\n Gantt: {}".format(self.kernel.gantt))
+            if self.kernel.exportador is not None:
+                self.kernel.exportador.cerrar()
+            ## el Gantt solo se arma si el log lo va a mostrar
+            log.logger.info("\n Gantt: %s", self.kernel.gantt)
        
                 
 class IoInInterruptionHandler(AbstractInterruptionHandler):
@@ -147,7 +171,7 @@ class IoInInterruptionHandler(AbstractInterruptionHandler):
 
         self.kernel.ioDeviceController.runOperation(pcbRunning,operation)
 
-        if len(self.kernel.schaduler.hayElementosEnReadyQueve()) >= 1:
+        if self.kernel.schaduler.hayElementosEnReadyQueve():
             next_pcb = self.kernel.schaduler.next()
             self.kernel.dispatcher.load(next_pcb)
 
@@ -164,7 +188,7 @@ class IoOutInterruptionHandler(AbstractInterruptionHandler):
 class HandlerTime(AbstractInterruptionHandler):
 
     def execute(self, irq):
-        if len(self.kernel.schaduler.hayElementosEnReadyQueve()) >= 1:
+        if self.kernel.schaduler.hayElementosEnReadyQueve():
             if self.kernel.pcbTable.pcbEnRunning() != None:
                 pcbCorriendo = self.kernel.pcbTable.pcbEnRunning()
                 self.kernel.schaduler.expropiar(pcbCorriendo)
@@ -179,7 +203,7 @@ class NewHandler(AbstractInterruptionHandler):
   
         baseDir = self._kernel.loader.load(program)
         pcb = PCB(baseDir,program,prioridad)
-        self.kernel.pcbTable.cagarPcb(pcb)
+        pcb = self.kernel.pcbTable.cagarPcb(pcb)
         
         self.kernel.schaduler.add(pcb)
 
@@ -192,9 +216,15 @@ class NewHandler(AbstractInterruptionHandler):
 class Kernel():
 
     def __init__(self):
-        self.loader = Loader()  
+        self.memoryManager = FirstFit(HARDWARE.memory.size)
+        # self.memoryManager = BestFit(HARDWARE.memory.size)
+        # self.memoryManager = WorstFit(HARDWARE.memory.size)
         self.pcbTable = PCBTable()
+        # self.pcbTable = PCBTablaColumnar()
         self.dispatcher = Dispatcher()
+        self.compactador = Compactador(self)
+        # self.compactador.umbral = 0.5
+        self.loader = Loader(self.memoryManager, self.compactador)
         
         # self.schaduler = FCFS(self)
         # self.schaduler = PrioridadNoExpropiativa(self)
@@ -204,6 +234,11 @@ class Kernel():
         
         self.gantt = Gantt(self)
         HARDWARE.clock.addSubscriber(self.gantt)
+        self.pcbTable.addSubscriber(self.gantt)
+
+        ## exportacion de los cambios de estado a un archivo (desactivada por default)
+        self.exportador = None
+        # self.exportarEventos("eventos.csv", EXPORTAR_CSV)
         
 
         killHandler = KillInterruptionHandler(self)
@@ -235,6 +270,12 @@ class Kernel():
              self.run(x) 
 
 
+    ## escribe los cambios de estado en el archivo a medida que corre la simulacion
+    def exportarEventos(self, path, formato=EXPORTAR_CSV):
+        self.exportador = ExportadorDeEventos(self.gantt, path, formato)
+        self.pcbTable.addSubscriber(self.exportador)
+        return self.exportador
+
     ## emulates a "system call" for programs execution
     def run(self, program,prioridad):
         New = IRQ(NEW_INTERRUPTION_TYPE,{"program":program,"prioridad":prioridad})
@@ -245,57 +286,523 @@ class Kernel():
     def __repr__(self):
         return "Kernel "
 class Loader():
-    def __init__ (self):
-        self.indiceDecarga = 0
+    def __init__ (self, memoryManager, compactador):
+        self._memoryManager = memoryManager
+        self._compactador = compactador
      
     def load (self, program):
         progSize = len(program.instructions)
+        baseDir = self._memoryManager.alloc(progSize)
+        if baseDir is None and self._memoryManager.memoriaLibre() >= progSize:
+            ## hay memoria suficiente pero esta fragmentada
+            self._compactador.compactar()
+            baseDir = self._memoryManager.alloc(progSize)
+        if baseDir is None:
+            raise Exception("Not enough memory: no hole of {size} cells, {libre} free".format(size = progSize, libre = self._memoryManager.memoriaLibre()))
         for index in range(0, progSize):
             inst = program.instructions[index]
-            HARDWARE.memory.write(index + self.indiceDecarga, inst)
-        self.indiceDecarga += progSize
-        return self.indiceDecarga - progSize
+            HARDWARE.memory.write(index + baseDir, inst)
+        return baseDir
+
+
+## nodo de un ArbolDeHuecos
+class NodoDeHueco():
+    __slots__ = ('clave', 'tamanio', 'prioridad', 'izquierdo', 'derecho', 'maximo')
+
+    def __init__(self, clave, tamanio, prioridad):
+        self.clave = clave
+        self.tamanio = tamanio
+        self.prioridad = prioridad
+        self.izquierdo = None
+        self.derecho = None
+        self.maximo = tamanio
+
+## arbol binario de busqueda balanceado (un treap: cada nodo tiene una prioridad al
+## azar y el arbol es un heap por prioridad) con un nodo por hueco, ordenado por
+## clave. Cada nodo guarda el mayor tamaño de hueco de su subarbol. Agregar, sacar
+## y buscar cuestan O(log n) en promedio, con n la cantidad de huecos
+class ArbolDeHuecos():
+
+    def __init__(self):
+        self._raiz = None
+        self._azar = random.Random(0)
+
+    def agregar(self, clave, tamanio):
+        menores, mayores = self._partir(self._raiz, clave)
+        nodo = NodoDeHueco(clave, tamanio, self._azar.random())
+        self._raiz = self._unir(self._unir(menores, nodo), mayores)
+
+    def sacar(self, clave):
+        self._raiz = self._sacar(self._raiz, clave)
+
+    ## el mayor tamaño de hueco (0 si no hay huecos)
+    def maximo(self):
+        return 0 if self._raiz is None else self._raiz.maximo
+
+    ## la menor clave de un hueco de al menos "tamanio" celdas (None si no hay)
+    def primeroQueAlcanza(self, tamanio):
+        nodo = self._raiz
+        if nodo is None or nodo.maximo < tamanio:
+            return None
+        while True:
+            if nodo.izquierdo is not None and nodo.izquierdo.maximo >= tamanio:
+                nodo = nodo.izquierdo
+            elif nodo.tamanio >= tamanio:
+                return nodo.clave
+            else:
+                nodo = nodo.derecho
+
+    ## la menor clave mayor o igual a "clave" (None si no hay)
+    def siguiente(self, clave):
+        resultado = None
+        nodo = self._raiz
+        while nodo is not None:
+            if nodo.clave >= clave:
+                resultado = nodo.clave
+                nodo = nodo.izquierdo
+            else:
+                nodo = nodo.derecho
+        return resultado
+
+    ## separa el arbol en las claves menores a "clave" y el resto
+    def _partir(self, nodo, clave):
+        if nodo is None:
+            return None, None
+        if nodo.clave < clave:
+            nodo.derecho, mayores = self._partir(nodo.derecho, clave)
+            self._actualizar(nodo)
+            return nodo, mayores
+        menores, nodo.izquierdo = self._partir(nodo.izquierdo, clave)
+        self._actualizar(nodo)
+        return menores, nodo
+
+    ## une dos arboles donde todas las claves de "menores" van antes que las de "mayores"
+    def _unir(self, menores, mayores):
+        if menores is None:
+            return mayores
+        if mayores is None:
+            return menores
+        if menores.prioridad > mayores.prioridad:
+            menores.derecho = self._unir(menores.derecho, mayores)
+            self._actualizar(menores)
+            return menores
+        mayores.izquierdo = self._unir(menores, mayores.izquierdo)
+        self._actualizar(mayores)
+        return mayores
+
+    def _sacar(self, nodo, clave):
+        if nodo.clave == clave:
+            return self._unir(nodo.izquierdo, nodo.derecho)
+        if clave < nodo.clave:
+            nodo.izquierdo = self._sacar(nodo.izquierdo, clave)
+        else:
+            nodo.derecho = self._sacar(nodo.derecho, clave)
+        self._actualizar(nodo)
+        return nodo
+
+    def _actualizar(self, nodo):
+        maximo = nodo.tamanio
+        if nodo.izquierdo is not None and nodo.izquierdo.maximo > maximo:
+            maximo = nodo.izquierdo.maximo
+        if nodo.derecho is not None and nodo.derecho.maximo > maximo:
+            maximo = nodo.derecho.maximo
+        nodo.maximo = maximo
+
+
+## asignacion continua: administra los huecos libres de la memoria
+## (ver parcial/mem_ac). Los huecos estan indexados:
+##  - por direccion: dicts inicio -> tamaño y fin -> inicio, para unir
+##    en O(1) un bloque liberado con los huecos vecinos
+##  - en dos ArbolDeHuecos, por inicio (el primer hueco que alcanza) y por
+##    (tamaño, inicio) (el mas chico o el mas grande que alcanza), en O(log n)
+## Todo ocupa lugar por hueco, no por celda de memoria
+class MemoryManager():
+
+    def __init__(self, size):
+        self._size = size
+        self._huecos = dict()
+        self._finales = dict()
+        self._porDireccion = ArbolDeHuecos()
+        self._porTamanio = ArbolDeHuecos()
+        self._libre = 0
+        if size > 0:
+            self._agregarHueco(0, size)
+
+    ## devuelve la direccion base del bloque asignado (None si no hay hueco que alcance)
+    def alloc(self, size):
+        inicio = self.buscarHueco(size)
+        if inicio is None:
+            return None
+        tamanio = self._huecos[inicio]
+        self._sacarHueco(inicio)
+        if tamanio > size:
+            self._agregarHueco(inicio + size, tamanio - size)
+        return inicio
+
+    def free(self, baseDir, size):
+        inicio = baseDir
+        fin = baseDir + size
+        if fin in self._huecos:
+            ## hay un hueco justo despues: lo unimos
+            size += self._huecos[fin]
+            self._sacarHueco(fin)
+        if inicio in self._finales:
+            ## hay un hueco justo antes: lo unimos
+            inicio = self._finales[inicio]
+            size += self._huecos[inicio]
+            self._sacarHueco(inicio)
+        self._agregarHueco(inicio, size)
+
+    ## inicio del hueco a usar para un bloque de "size" celdas (None si no hay)
+    def buscarHueco(self, size):
+        log.logger.error("-- BUSCARHUECO MUST BE OVERRIDEN in class {classname}".format(classname=self.__class__.__name__))
+
+    def memoriaLibre(self):
+        return self._libre
+
+    def mayorHueco(self):
+        return self._porDireccion.maximo()
+
+    ## fragmentacion externa: que parte de la memoria libre no esta en el mayor hueco
+    def fragmentacion(self):
+        if self._libre == 0:
+            return 0
+        return 1 - self.mayorHueco() / self._libre
+
+    ## despues de compactar: lo ocupado es [0, ocupado) y el resto es un solo hueco
+    def compactada(self, ocupado):
+        for inicio in list(self._huecos):
+            self._sacarHueco(inicio)
+        if ocupado < self._size:
+            self._agregarHueco(ocupado, self._size - ocupado)
+
+    ## los huecos libres (inicio, tamaño) ordenados por direccion
+    def huecos(self):
+        return sorted(self._huecos.items())
+
+    def _agregarHueco(self, inicio, size):
+        self._huecos[inicio] = size
+        self._finales[inicio + size] = inicio
+        self._porDireccion.agregar(inicio, size)
+        self._porTamanio.agregar((size, inicio), size)
+        self._libre += size
+
+    def _sacarHueco(self, inicio):
+        size = self._huecos.pop(inicio)
+        del self._finales[inicio + size]
+        self._porDireccion.sacar(inicio)
+        self._porTamanio.sacar((size, inicio))
+        self._libre -= size
+
+    def __repr__(self):
+        return tabulate(self.huecos(), headers=['Inicio', 'Tamaño'], tablefmt='psql')
+
+class FirstFit(MemoryManager):
+
+    ## el hueco de menor direccion que alcanza
+    def buscarHueco(self, size):
+        return self._porDireccion.primeroQueAlcanza(size)
+
+class BestFit(MemoryManager):
+
+    ## el hueco mas chico que alcanza
+    def buscarHueco(self, size):
+        clave = self._porTamanio.siguiente((size, -1))
+        if clave is None:
+            return None
+        return clave[1]
+
+class WorstFit(MemoryManager):
+
+    ## el hueco mas grande (si hay varios, el de menor direccion)
+    def buscarHueco(self, size):
+        mayor = self.mayorHueco()
+        if mayor == 0 or mayor < size:
+            return None
+        return self._porTamanio.siguiente((mayor, -1))[1]
+
+
+## compacta la memoria: mueve las imagenes de los procesos vivos hacia
+## el principio de la memoria y deja un solo hueco al final
+class Compactador():
+
+    def __init__(self, kernel):
+        self._kernel = kernel
+        ## costo: cuantas celdas se mueven por tick
+        self.celdasPorTick = 8
+        ## si la fragmentacion supera el umbral se compacta al liberar memoria (None = nunca)
+        self.umbral = None
+        self.compactaciones = 0
+        self.celdasMovidas = 0
+        self.ticksCargados = 0
+
+    def compactarSiHaceFalta(self):
+        if self.umbral is not None and self._kernel.memoryManager.fragmentacion() > self.umbral:
+            self.compactar()
+
+    def compactar(self):
+        vivos = [pcb for pcb in self._kernel.pcbTable.procesos.values() if pcb.state != TERMINATED]
+        vivos.sort(key=lambda pcb: pcb.baseDir)
+        destino = 0
+        movidas = 0
+        for pcb in vivos:
+            if pcb.baseDir != destino:
+                imagen = HARDWARE.memory.read_block(pcb.baseDir, pcb.size)
+                HARDWARE.memory.write_block(destino, imagen)
+                pcb.baseDir = destino
+                movidas += pcb.size
+                if pcb.state == RUNNING:
+                    self._kernel.dispatcher.relocate(pcb)
+            destino += pcb.size
+        self._kernel.memoryManager.compactada(destino)
+
+        ticks = -(-movidas // self.celdasPorTick)
+        self.compactaciones += 1
+        self.celdasMovidas += movidas
+        self.ticksCargados += ticks
+        log.logger.info(" Compactacion: {movidas} celdas movidas, {ticks} ticks".format(movidas=movidas, ticks=ticks))
+
+    def __repr__(self):
+        return "Compactador: {compactaciones} compactaciones, {celdas} celdas movidas, {ticks} ticks".format(compactaciones=self.compactaciones, celdas=self.celdasMovidas, ticks=self.ticksCargados)
 
 
 class PCB():
+    __slots__ = ('baseDir', 'size', 'programPath', 'pid', 'pc', '_state', '_pcbTable', 'prioridad')
+
     def __init__(self,base,program,prioridad):
         self.baseDir = base
+        self.size = len(program.instructions)
         self.programPath = program.name
         self.pid = 0
         self.pc = 0
-        self.state = NEW
+        self._state = NEW
+        ## la PCBTable que lleva la cuenta de los estados (None hasta que se carga)
+        self._pcbTable = None
         self.prioridad = prioridad
+
+    @property
+    def state(self):
+        return self._state
+
+    ## los cambios de estado pasan por la PCBTable para mantener sus indices
+    @state.setter
+    def state(self, estado):
+        if self._pcbTable is None:
+            self._state = estado
+        else:
+            self._pcbTable.cambiarEstado(self, estado)
+
     def __repr__(self):
         return "pid {} baseDir {} pc {} state {} programPath {}".format(self.pid,self.baseDir,self.pc,self.state,self.programPath)
 
+## ademas de los PCBs por pid, guarda el proceso en RUNNING y los pids que hay
+## en cada estado, asi las consultas por estado no recorren toda la tabla
 class PCBTable():
     def __init__(self):
         self.procesos = {}
         self.pid = 0 
+        self._running = None
+        self._porEstado = {estado: set() for estado in ESTADOS}
+        self._subscribers = []
     
     def __repr__(self):
         return tabulate(enumerate(self.procesos), tablefmt='psql')
 
+    ## los subscribers reciben cambioDeEstado(pcb, estado) cuando se carga un PCB
+    ## y en cada cambio de estado
+    def addSubscriber(self, subscriber):
+        self._subscribers.append(subscriber)
+
+    def _notificar(self, pcb, estado):
+        for subscriber in self._subscribers:
+            subscriber.cambioDeEstado(pcb, estado)
+
     def cagarPcb(self,pcb):
         pidNuevo = self.pid
         self.procesos[pidNuevo] = pcb
         pcb.pid = self.pid
         self.pid +=1
+        pcb._pcbTable = self
+        self._porEstado[pcb.state].add(pcb.pid)
+        if pcb.state == RUNNING:
+            self._running = pcb
+        self._notificar(pcb, pcb.state)
+        return pcb
+
+    ## el unico lugar donde cambia el estado de un PCB de la tabla
+    def cambiarEstado(self, pcb, estado):
+        self._porEstado[pcb.state].discard(pcb.pid)
+        self._porEstado[estado].add(pcb.pid)
+        pcb._state = estado
+        if estado == RUNNING:
+            self._running = pcb
+        elif self._running is pcb:
+            self._running = None
+        self._notificar(pcb, estado)
 
     def pcbEnRunning (self):
-        for k,v in  self.procesos.items():
-            if v.state == RUNNING:
-                return v 
-        return None
+        return self._running
+
+    ## cuantos procesos hay en el estado
+    def cantidad (self, estado):
+        return len(self._porEstado[estado])
+
+    ## los pids de los procesos en el estado (una copia: el indice cambia con cada cambio de estado)
+    def pids (self, estado):
+        return frozenset(self._porEstado[estado])
 
     def todosLosProcesosTerminaron (self):
-        for k,v in  self.procesos.items():
-            if v.state != TERMINATED:
-                return False
-             
-        return True
+        return len(self._porEstado[TERMINATED]) == len(self.procesos)
                 
     
+## PCBTable que guarda los procesos por columnas: un array por campo, indexado
+## por pid, en lugar de un objeto por proceso. El kernel usa PCBColumnar, que son
+## vistas sobre las columnas; solo se guardan las de los procesos que no terminaron.
+## Las consultas sobre todos los procesos se hacen sobre las columnas (con numpy si esta)
+class PCBTablaColumnar(PCBTable):
+    def __init__(self):
+        super().__init__()
+        self.procesos = ProcesosColumnar(self)
+        ## las consultas por estado salen de la columna de estados, alcanza con contarlos
+        self._porEstado = None
+        self._cantidades = {estado: 0 for estado in ESTADOS}
+        self._vistas = dict()
+        self._pc = array('q')
+        self._baseDir = array('q')
+        self._size = array('q')
+        self._estado = array('b')
+        self._prioridad = array('q')
+        self._programPath = []
+
+    def cagarPcb(self,pcb):
+        pid = self.pid
+        pcb.pid = pid
+        self._pc.append(pcb.pc)
+        self._baseDir.append(pcb.baseDir)
+        self._size.append(pcb.size)
+        self._estado.append(ESTADOS.index(pcb.state))
+        self._prioridad.append(pcb.prioridad)
+        self._programPath.append(pcb.programPath)
+        self.pid += 1
+        self._cantidades[pcb.state] += 1
+        vista = PCBColumnar(self, pid)
+        if pcb.state != TERMINATED:
+            self._vistas[pid] = vista
+        if pcb.state == RUNNING:
+            self._running = vista
+        self._notificar(vista, pcb.state)
+        return vista
+
+    def cambiarEstado(self, pcb, estado):
+        self._cantidades[pcb.state] -= 1
+        self._cantidades[estado] += 1
+        pcb._state = estado
+        if estado == RUNNING:
+            self._running = pcb
+        elif self._running is pcb:
+            self._running = None
+        if estado == TERMINATED:
+            self._vistas.pop(pcb.pid, None)
+        self._notificar(pcb, estado)
+
+    ## el PCB del pid (siempre la misma vista mientras el proceso no termine)
+    def vista(self, pid):
+        if not 0 <= pid < self.pid:
+            raise KeyError(pid)
+        vista = self._vistas.get(pid)
+        return vista if vista is not None else PCBColumnar(self, pid)
+
+    def cantidad (self, estado):
+        return self._cantidades[estado]
+
+    def pids (self, estado):
+        codigo = ESTADOS.index(estado)
+        if numpy is not None:
+            return frozenset(numpy.flatnonzero(numpy.frombuffer(self._estado, dtype=numpy.int8) == codigo).tolist())
+        return frozenset(pid for pid, codigoPid in enumerate(self._estado) if codigoPid == codigo)
+
+    ## la menor prioridad (la mas urgente) de los procesos en el estado, None si no hay ninguno
+    def prioridadMinima (self, estado):
+        if self._cantidades[estado] == 0:
+            return None
+        codigo = ESTADOS.index(estado)
+        if numpy is not None:
+            estados = numpy.frombuffer(self._estado, dtype=numpy.int8)
+            return int(numpy.frombuffer(self._prioridad, dtype=numpy.int64)[estados == codigo].min())
+        return min(prioridad for prioridad, codigoPid in zip(self._prioridad, self._estado) if codigoPid == codigo)
+
+    def todosLosProcesosTerminaron (self):
+        return self._cantidades[TERMINATED] == self.pid
+
+## los procesos de una PCBTablaColumnar como diccionario pid -> PCB
+class ProcesosColumnar(Mapping):
+    def __init__(self, tabla):
+        self._tabla = tabla
+
+    def __getitem__(self, pid):
+        return self._tabla.vista(pid)
+
+    def __iter__(self):
+        return iter(range(0, self._tabla.pid))
+
+    def __len__(self):
+        return self._tabla.pid
+
+## un PCB de una PCBTablaColumnar: lee y escribe las columnas de su pid
+class PCBColumnar():
+    __slots__ = ('_tabla', 'pid')
+
+    def __init__(self, tabla, pid):
+        self._tabla = tabla
+        self.pid = pid
+
+    @property
+    def pc(self):
+        return self._tabla._pc[self.pid]
+
+    @pc.setter
+    def pc(self, pc):
+        self._tabla._pc[self.pid] = pc
+
+    @property
+    def baseDir(self):
+        return self._tabla._baseDir[self.pid]
+
+    @baseDir.setter
+    def baseDir(self, baseDir):
+        self._tabla._baseDir[self.pid] = baseDir
+
+    @property
+    def size(self):
+        return self._tabla._size[self.pid]
+
+    @property
+    def programPath(self):
+        return self._tabla._programPath[self.pid]
+
+    @property
+    def prioridad(self):
+        return self._tabla._prioridad[self.pid]
+
+    @property
+    def _state(self):
+        return ESTADOS[self._tabla._estado[self.pid]]
+
+    @_state.setter
+    def _state(self, estado):
+        self._tabla._estado[self.pid] = ESTADOS.index(estado)
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, estado):
+        self._tabla.cambiarEstado(self, estado)
+
+    def __repr__(self):
+        return "pid {} baseDir {} pc {} state {} programPath {}".format(self.pid,self.baseDir,self.pc,self.state,self.programPath)
+
 class Dispatcher():
 
     def load(self, pcb):
@@ -308,44 +815,174 @@ class Dispatcher():
         pcb.pc = HARDWARE.cpu.pc
         HARDWARE.cpu.pc = -1
 
+    ## el proceso en ejecucion cambio de lugar en memoria (compactacion)
+    def relocate(self, pcb):
+        HARDWARE.mmu.baseDir = pcb.baseDir
+
+## guarda, para cada proceso, los cambios de estado como (fila, estado): el estado
+## vale desde esa fila hasta el proximo cambio. En cada tick solo se cuenta una fila
+## mas; la tabla con el estado de todos los procesos en cada tick se arma en __repr__
 class Gantt():
    
     def __init__(self,kernel):
-        self._ticks = []
+        self._filas = 0
+        ## pid -> [(fila, estado)]
+        self._cambios = dict()
         self._kernel = kernel
    
     def tick (self,tickNbr):
         log.logger.info("guardando informacion de los estados de los PCBs en el tick N {}".format(tickNbr))
+        self._filas += 1
+
+    ## el nuevo estado se ve a partir de la proxima fila; si el proceso ya habia
+    ## cambiado antes de esa fila, vale el ultimo cambio
+    def cambioDeEstado(self, pcb, estado):
+        cambios = self._cambios.setdefault(pcb.pid, [])
+        if cambios and cambios[-1][0] == self._filas:
+            cambios.pop()
+        if not cambios or cambios[-1][1] != estado:
+            cambios.append((self._filas, estado))
+
+    @property
+    def ticks(self):
+        return self._filas
+
+    ## los pids de los procesos que aparecen en el Gantt
+    def pids(self):
+        return list(self._cambios)
+
+    ## los intervalos (desde, hasta, estado) del proceso; "hasta" no se incluye
+    def intervalos(self, pid):
+        cambios = self._cambios.get(pid, [])
+        for indice, (desde, estado) in enumerate(cambios):
+            hasta = cambios[indice + 1][0] if indice + 1 < len(cambios) else self._filas
+            if desde < hasta:
+                yield (desde, hasta, estado)
+
+    ## el estado de cada proceso en cada tick (un diccionario pid -> estado por fila)
+    def filas(self):
+        cambios = sorted((fila, pid, estado) for pid, cambiosPid in self._cambios.items() for fila, estado in cambiosPid)
         pcbYEstado = dict()
-        pcbTable = self._kernel.pcbTable.procesos
+        indice = 0
+        for fila in range(0, self._filas):
+            while indice < len(cambios) and cambios[indice][0] == fila:
+                pcbYEstado[cambios[indice][1]] = cambios[indice][2]
+                indice += 1
+            yield dict(pcbYEstado)
 
-        for pid,pcb in pcbTable.items():
-            pcbYEstado[pid] = pcb.state
-        self._ticks.append(pcbYEstado)
-           
     def __repr__(self):
-        return tabulate(enumerate(self._ticks), tablefmt='grid')
+        return tabulate(enumerate(self.filas()), tablefmt='grid')
+
+## escribe cada cambio de estado (tick, pid, estado, programa) en un archivo CSV o
+## JSON Lines mientras corre la simulacion. Los registros se juntan en un buffer de
+## "tamanioDeBuffer" registros que se escribe cuando se llena y al cerrar, asi la
+## memoria no crece con la duracion de la corrida. El tick de un cambio es la fila
+## del Gantt desde la que vale (se lee del Gantt, asi coinciden aunque el exportador
+## se agregue en medio de la corrida). Los cambios de un proceso dentro de un mismo
+## tick se juntan como en el Gantt: queda el ultimo, y no se escribe si deja al
+## proceso en el estado que ya tenia. Una vez cerrado se ignoran los cambios
+class ExportadorDeEventos():
+    CAMPOS = ('tick', 'pid', 'estado', 'programa')
+
+    def __init__(self, gantt, path, formato=EXPORTAR_CSV, tamanioDeBuffer=4096):
+        if formato not in (EXPORTAR_CSV, EXPORTAR_JSONL):
+            raise Exception("Unknown export format {formato}".format(formato = formato))
+        self._gantt = gantt
+        self._formato = formato
+        self._tamanioDeBuffer = tamanioDeBuffer
+        self._buffer = []
+        ## cambios del tick actual que todavia pueden pisarse: pid -> (estado, programa)
+        self._pendientes = dict()
+        self._tick = None
+        ## ultimo estado escrito de cada proceso
+        self._estados = dict()
+        self._registros = 0
+        self._archivo = open(path, 'w', newline='')
+        if formato == EXPORTAR_CSV:
+            self._csv = csv.writer(self._archivo)
+            self._csv.writerow(self.CAMPOS)
+
+    @property
+    def registros(self):
+        return self._registros
+
+    def cambioDeEstado(self, pcb, estado):
+        if self._archivo.closed:
+            return
+        if self._gantt.ticks != self._tick:
+            self._cerrarTick()
+            self._tick = self._gantt.ticks
+        self._pendientes[pcb.pid] = (estado, pcb.programPath)
+
+    ## pasa al buffer los cambios del tick que termino
+    def _cerrarTick(self):
+        for pid, (estado, programa) in self._pendientes.items():
+            if self._estados.get(pid) != estado:
+                self._estados[pid] = estado
+                self._buffer.append((self._tick, pid, estado, programa))
+                self._registros += 1
+        self._pendientes = dict()
+        if len(self._buffer) >= self._tamanioDeBuffer:
+            self.flush()
+
+    ## escribe los registros de los ticks ya terminados
+    def flush(self):
+        if self._formato == EXPORTAR_CSV:
+            self._csv.writerows(self._buffer)
+        else:
+            self._archivo.write("".join(json.dumps(dict(zip(self.CAMPOS, registro))) + "\n" for registro in self._buffer))
+        self._buffer = []
+        self._archivo.flush()
+
+    def cerrar(self):
+        if not self._archivo.closed:
+            self._cerrarTick()
+            self.flush()
+            self._archivo.close()
 
+## cola de listos FIFO (FCFS y Round Robin)
 class readyQueve():
     def __init__(self):
-        self.pcbs = []
-    def insert(self,indice,pcb):
-        pcb.state = READY
-        self.pcbs.insert(indice,pcb)
+        self.pcbs = deque()
     def agregar (self,pcb):
         pcb.state = READY
         self.pcbs.append(pcb)
     def sacar (self):
-        return self.pcbs.pop(0)
+        return self.pcbs.popleft()
 
     def elementosDeLista(self):
-        return self.pcbs
+        return list(self.pcbs)
+
+    def __len__(self):
+        return len(self.pcbs)
+
+## cola de listos ordenada por prioridad (menor numero = mas prioridad), con un heap:
+## agregar y sacar cuestan O(log n). Entre procesos de igual prioridad sale primero
+## el que llego ultimo, como cuando se insertaba delante de los de igual prioridad
+class readyQueveConPrioridad():
+    def __init__(self):
+        self.pcbs = []
+        self._orden = 0
+    def agregar (self,pcb):
+        pcb.state = READY
+        self._orden += 1
+        heapq.heappush(self.pcbs, (pcb.prioridad, -self._orden, pcb))
+    def sacar (self):
+        return heapq.heappop(self.pcbs)[2]
+
+    def elementosDeLista(self):
+        return [pcb for prioridad, orden, pcb in sorted(self.pcbs, key=lambda entrada: entrada[:2])]
+
+    def __len__(self):
+        return len(self.pcbs)
 
 class Schaduler():
     
     def __init__(self,kernel):
-        self.readyQueve = readyQueve()
+        self.readyQueve = self.nuevaReadyQueve()
         self.kernel = kernel
+    def nuevaReadyQueve(self):
+        return readyQueve()
     def add (self):
         pass
     def expropiar(self,pcb):
@@ -353,12 +990,9 @@ class Schaduler():
     def next (self):
         return self.readyQueve.sacar()
     def hayElementosEnReadyQueve(self):
-        return self.readyQueve.elementosDeLista()
+        return len(self.readyQueve) >= 1
     def enColarOrdenado(self,pcb):
-        index = 0
-        while index < len(self.readyQueve.pcbs) and self.readyQueve.pcbs[index].prioridad < pcb.prioridad:
-            index = index + 1
-        self.readyQueve.insert(index,pcb)
+        self.readyQueve.agregar(pcb)
 
 class FCFS(Schaduler):
 
@@ -370,6 +1004,9 @@ class FCFS(Schaduler):
 
 
 class PrioridadNoExpropiativa(Schaduler):
+    def nuevaReadyQueve(self):
+        return readyQueveConPrioridad()
+
     def add (self,pcb):
 
         if  self.kernel.pcbTable.pcbEnRunning() == None:
@@ -378,6 +1015,8 @@ class PrioridadNoExpropiativa(Schaduler):
             self.enColarOrdenado(pcb)
 
 class PrioridadExpropiativa(Schaduler):
+    def nuevaReadyQueve(self):
+        return readyQueveConPrioridad()
 
     def add (self,pcb):
         if  self.kernel.pcbTable.pcbEnRunning() == None:
@@ -402,7 +1041,7 @@ class Roundribin(Schaduler):
         else:
             self.readyQueve.agregar(pcb)
     def expropiar(self,pcb):
-        if len(self.kernel.schaduler.hayElementosEnReadyQueve()) >= 1:
+        if self.kernel.schaduler.hayElementosEnReadyQueve():
             if self.kernel.pcbTable.pcbEnRunning() != None:
                 pcbCorriendo = self.kernel.pcbTable.pcbEnRunning()
                 self.kernel.dispatcher.save(pcbCorriendo)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+from hardware import *
+from so import *
+from metricas import Metricas
+from time import perf_counter
+import logging
+import log
+
+
+## lanza los programas de una carga de trabajo en su tick de llegada.
+## Un programa que llega en el tick N se lanza al final del tick N - 1, asi
+## puede correr en el tick N (los que llegan en el tick 0 se lanzan antes de empezar)
+class Lanzador():
+
+    def __init__(self, kernel, carga):
+        self._kernel = kernel
+        self._pendientes = sorted(carga, key=lambda programa: programa[0])
+        self._siguiente = 0
+
+    def lanzarHasta(self, llegada):
+        while self._siguiente < len(self._pendientes) and self._pendientes[self._siguiente][0] <= llegada:
+            _, path, prioridad = self._pendientes[self._siguiente]
+            self._kernel.run(path, prioridad)
+            self._siguiente += 1
+
+    def tick(self, tickNbr):
+        self.lanzarHasta(tickNbr + 1)
+
+    def nextEventTick(self, tickNbr):
+        if self._siguiente == len(self._pendientes):
+            return None
+        return max(tickNbr, self._pendientes[self._siguiente][0] - 1)
+
+    def skipTicks(self, fromTick, toTick):
+        pass
+
+
+## cuenta los cambios de contexto (cada vez que un proceso pasa a RUNNING)
+class ContadorDeCambiosDeContexto():
+
+    def __init__(self):
+        self.cambios = 0
+
+    def cambioDeEstado(self, pcb, estado):
+        if estado == RUNNING:
+            self.cambios += 1
+
+
+## corre la misma carga de trabajo con cada scheduler, cada vez en un Hardware
+## y un Kernel nuevos, y arma una tabla para compararlos.
+## La carga es una lista de (tick de llegada, Program, prioridad)
+class Benchmark():
+
+    def __init__(self, carga, memorySize=1024, maxTicks=100000):
+        self._carga = carga
+        self._memorySize = memorySize
+        self._maxTicks = maxTicks
+        self._filas = []
+
+    ## quantum: None deja el timer desactivado
+    def correr(self, nombre, claseDeSchaduler, quantum=None):
+        hardware = Hardware()
+        hardware.setup(self._memorySize, CLOCK_TURBO, eventDriven=True)
+        kernel = Kernel(hardware)
+        kernel.schaduler = claseDeSchaduler(kernel)
+        if quantum is not None:
+            hardware.timer.quantum = quantum
+        contador = ContadorDeCambiosDeContexto()
+        kernel.pcbTable.addSubscriber(contador)
+
+        carga = []
+        for llegada, program, prioridad in self._carga:
+            path = "c:/{name}".format(name=program.name)
+            kernel.fileSystem.write(path, program)
+            carga.append((llegada, path, prioridad))
+        lanzador = Lanzador(kernel, carga)
+        hardware.clock.addSubscriber(lanzador)
+
+        inicio = perf_counter()
+        lanzador.lanzarHasta(0)
+        hardware.clock.do_ticks(self._maxTicks)
+        segundos = perf_counter() - inicio
+        hardware.close()
+
+        metricas = Metricas(kernel.gantt)
+        self._filas.append([nombre, metricas.terminados(), metricas.duracion(), metricas.throughput(),
+                            metricas.esperaPromedio(), metricas.retornoPromedio(), metricas.respuestaPromedio(),
+                            contador.cambios, metricas.usoDeCpu(), metricas.duracion() / segundos if segundos else None])
+        return metricas
+
+    ## todos los schedulers del kernel, y Round Robin con cada quantum
+    def compararSchedulers(self, quantums=(2, 4, 8)):
+        self.correr("FCFS", FCFS)
+        self.correr("Prioridad no expropiativa", PrioridadNoExpropiativa)
+        self.correr("Prioridad expropiativa", PrioridadExpropiativa)
+        for quantum in quantums:
+            self.correr("Round Robin q={quantum}".format(quantum=quantum), Roundribin, quantum)
+        return self
+
+    def __repr__(self):
+        return tabulate(self._filas, headers=['Scheduler', 'Terminados', 'Ticks', 'Throughput', 'Espera prom.', 'Retorno prom.',
+                                              'Respuesta prom.', 'Cambios de contexto', 'Uso de CPU', 'Ticks/seg'],
+                        tablefmt='psql', floatfmt='.2f')
+
+
+##
+##  MAIN
+##
+if __name__ == '__main__':
+    log.setupLogger()
+    ## el log de cada tick es muy costoso para una comparacion
+    log.logger.setLevel(logging.WARNING)
+
+    ## la carga de parcial/scheduler/gantt_schedulers.md, con I/O en el proceso 1
+    carga = [
+        (0, Program("prg1.exe", [ASM.CPU(3), ASM.IO(), ASM.CPU(3)]), 5),
+        (1, Program("prg2.exe", [ASM.CPU(4)]), 2),
+        (2, Program("prg3.exe", [ASM.CPU(3)]), 3),
+        (3, Program("prg4.exe", [ASM.CPU(2)]), 1),
+    ]
+    print(Benchmark(carga).compararSchedulers())
@@ -1,15 +1,41 @@
 #!/usr/bin/env python
 
 from tabulate import tabulate
-from time import sleep
+from time import sleep, monotonic
 from threading import Thread, Lock
+from array import array
+import mmap
+import os
+from collections import OrderedDict
 import log
 
+try:
+    import numpy
+except ImportError:
+    ## numpy es opcional: solo lo usa MMU.translate_many
+    numpy = None
+
 ##  Estas son la instrucciones soportadas por nuestro CPU
 INSTRUCTION_IO = 'IO'
 INSTRUCTION_CPU = 'CPU'
 INSTRUCTION_EXIT = 'EXIT'
 
+##  Codificacion de las instrucciones en memoria (codigo de maquina):
+##  los 4 bits bajos son el opcode y el resto es el operando (ej: id de device);
+##  ninguna instruccion usa el operando todavia, asi que el CPU solo decodifica el opcode
+##  el opcode 0 queda reservado: es una celda de memoria vacia
+OPCODE_CPU = 1
+OPCODE_IO = 2
+OPCODE_EXIT = 3
+OPCODE_BITS = 4
+OPCODE_MASK = (1 << OPCODE_BITS) - 1
+
+##  tipo de cada celda de memoria (ver modulo array): 2 bytes sin signo
+MEMORY_TYPECODE = 'H'
+
+_OPCODES = {INSTRUCTION_CPU: OPCODE_CPU, INSTRUCTION_IO: OPCODE_IO, INSTRUCTION_EXIT: OPCODE_EXIT}
+_MNEMONICS = {OPCODE_CPU: INSTRUCTION_CPU, OPCODE_IO: INSTRUCTION_IO, OPCODE_EXIT: INSTRUCTION_EXIT}
+
 
 ## Helper for emulated machine code
 class ASM():
@@ -34,6 +60,25 @@ class ASM():
     def isIO(self, instruction):
         return INSTRUCTION_IO == instruction
 
+    @classmethod
+    def isCPU(self, instruction):
+        return INSTRUCTION_CPU == instruction
+
+    ## traduce una instruccion "legible" a su codigo de maquina
+    @classmethod
+    def encode(self, instruction, operand = 0):
+        return _OPCODES[instruction] | (operand << OPCODE_BITS)
+
+    ## traduce un codigo de maquina a su forma "legible"
+    @classmethod
+    def decode(self, word):
+        return _MNEMONICS[word & OPCODE_MASK]
+
+    ## traduce una lista de instrucciones a un bloque de codigo de maquina
+    @classmethod
+    def assemble(self, instructions):
+        return array(MEMORY_TYPECODE, [self.encode(instruction) for instruction in instructions])
+
 
 ##  Estas son la interrupciones soportadas por nuestro Kernel
 KILL_INTERRUPTION_TYPE = "#KILL"
@@ -41,6 +86,8 @@ IO_IN_INTERRUPTION_TYPE = "#IO_IN"
 IO_OUT_INTERRUPTION_TYPE = "#IO_OUT"
 NEW_INTERRUPTION_TYPE = "#NEW"
 TIMEOUT_INTERRUPTION_TYPE = "#TIMEOUT"
+PAGE_FAULT_INTERRUPTION_TYPE = "#PAGE_FAULT"
+COPY_ON_WRITE_INTERRUPTION_TYPE = "#COPY_ON_WRITE"
 
 ## emulates an Interrupt request
 class IRQ:
@@ -75,16 +122,45 @@ class InterruptVector():
         self.lock.release()
 
 
+##  Velocidades predefinidas del Clock (en ticks por segundo)
+CLOCK_REAL_TIME = 1     ## un tick por segundo, como el hardware original
+CLOCK_TURBO = 0         ## sin esperas: "tan rapido como se pueda"
+
+
 ## emulates the Internal Clock
+##
+## En modo "event driven" el clock le pregunta a cada subscriber cual es
+## el proximo tick en el que tiene algo para hacer (nextEventTick) y salta
+## directamente a ese tick. Los ticks intermedios no generan IRQs ni cambios
+## de estado, solo se le avisa a cada subscriber con skipTicks(desde, hasta)
+## para que actualice sus contadores. Un subscriber que no implementa
+## nextEventTick se considera "ocupado" en todos los ticks.
+## Los ticks salteados no consumen tiempo real (no se "duermen").
+## Con el CPU ocupado, el Timer hace que se salteen las rafagas de
+## instrucciones CPU: se ejecutan todas juntas con Cpu.burst.
 class Clock():
 
-    def __init__(self):
+    def __init__(self, ticksPerSecond = CLOCK_REAL_TIME, eventDriven = False):
         self._subscribers = []
         self._running = False
+        self.ticksPerSecond = ticksPerSecond
+        self._eventDriven = eventDriven
 
     def addSubscriber(self, subscriber):
         self._subscribers.append(subscriber)
 
+    @property
+    def ticksPerSecond(self):
+        return self._ticksPerSecond
+
+    ## CLOCK_TURBO (o None) desactiva las esperas entre ticks
+    @ticksPerSecond.setter
+    def ticksPerSecond(self, ticksPerSecond):
+        if ticksPerSecond is not None and ticksPerSecond < 0:
+            raise Exception("Invalid clock rate: {rate} ticks per second".format(rate = ticksPerSecond))
+        self._ticksPerSecond = ticksPerSecond
+        self._deadline = None
+
     def stop(self):
         self._running = False
 
@@ -94,9 +170,18 @@ class Clock():
         t = Thread(target=self.__start)
         t.start()
 
+    @property
+    def eventDriven(self):
+        return self._eventDriven
+
+    @eventDriven.setter
+    def eventDriven(self, eventDriven):
+        self._eventDriven = eventDriven
+
     def __start(self):
         tickNbr = 0
         while (self._running):
+            tickNbr = self._skipIdleTicks(tickNbr, None)
             self.tick(tickNbr)
             tickNbr += 1
 
@@ -105,21 +190,73 @@ class Clock():
         ## notify all subscriber that a new clock cycle has started
         for subscriber in self._subscribers:
             subscriber.tick(tickNbr)
-        ## wait 1 second and keep looping
-        sleep(1)
+        ## wait until the next cycle is due and keep looping
+        self._throttle()
+
+    def _throttle(self):
+        if not self._ticksPerSecond:
+            ## modo turbo: no esperamos
+            return
+        ## el tiempo que tardaron los subscribers se descuenta del periodo,
+        ## asi mantenemos la frecuencia pedida y no "1 segundo + trabajo"
+        now = monotonic()
+        if self._deadline is None:
+            self._deadline = now
+        self._deadline += 1.0 / self._ticksPerSecond
+        delay = self._deadline - now
+        if delay > 0:
+            sleep(delay)
+        else:
+            ## vamos atrasados: no acumulamos deuda de ticks
+            self._deadline = now
 
     def do_ticks(self, times):
         log.logger.info("---- :::: CLOCK do_ticks: {times} ::: -----".format(times=times))
-        for tickNbr in range(0, times):
+        tickNbr = self._skipIdleTicks(0, times)
+        while tickNbr < times:
             self.tick(tickNbr)
+            tickNbr = self._skipIdleTicks(tickNbr + 1, times)
+
+    ## devuelve el tick en el que hay que seguir, salteando los ticks "vacios"
+    ## lastTick es el limite de la corrida (None si no hay limite)
+    def _skipIdleTicks(self, tickNbr, lastTick):
+        if not self._eventDriven:
+            return tickNbr
+        nextTick = self._nextEventTick(tickNbr, lastTick)
+        if nextTick > tickNbr:
+            log.logger.info("        --------------- skip ticks: {fromTick} to {toTick} ---------------".format(fromTick = tickNbr, toTick = nextTick - 1))
+            for subscriber in self._subscribers:
+                subscriber.skipTicks(tickNbr, nextTick)
+        return nextTick
+
+    def _nextEventTick(self, tickNbr, lastTick):
+        nextTick = lastTick
+        for subscriber in self._subscribers:
+            if not hasattr(subscriber, 'nextEventTick'):
+                return tickNbr
+            subscriberTick = subscriber.nextEventTick(tickNbr)
+            if subscriberTick is None:
+                ## el subscriber no tiene nada pendiente
+                continue
+            if subscriberTick <= tickNbr:
+                return tickNbr
+            if nextTick is None or subscriberTick < nextTick:
+                nextTick = subscriberTick
+        if nextTick is None:
+            ## nadie tiene nada pendiente y no hay limite: seguimos de a un tick
+            ## (puede llegar una IRQ externa, por ejemplo un #NEW)
+            return tickNbr
+        return nextTick
 
 
 ## emulates the main memory (RAM)
+## las celdas se guardan en un array compacto de codigos de maquina
 class Memory():
 
     def __init__(self, size):
         self._size = size
-        self._cells = [''] * size
+        self._cells = array(MEMORY_TYPECODE, [0]) * size
+        self._view = memoryview(self._cells)
 
     def write(self, addr, value):
         self._cells[addr] = value
@@ -127,22 +264,138 @@ class Memory():
     def read(self, addr):
         return self._cells[addr]
 
+    ## escribe un bloque de celdas consecutivas con una sola asignacion
+    ## values puede ser un array/memoryview del mismo tipo o una lista de enteros
+    def write_block(self, addr, values):
+        if isinstance(values, list):
+            values = array(MEMORY_TYPECODE, values)
+        self._view[addr:addr + len(values)] = values
+
+    ## devuelve un memoryview (sin copiar) de size celdas a partir de addr
+    def read_block(self, addr, size):
+        return self._view[addr:addr + size]
+
     @property
     def size(self):
         return self._size
 
+    ## baja a disco el contenido (solo tiene sentido con MappedMemory)
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    ## cada celda se muestra como instruccion (vacia si tiene el opcode 0 reservado);
+    ## las que no son una instruccion conocida se muestran como numero
     def __repr__(self):
-        return tabulate(enumerate(self._cells), tablefmt='psql')
+        return tabulate(enumerate(self._celdaLegible(word) for word in self._cells), tablefmt='psql')
         ##return "Memoria = {mem}".format(mem=self._cells)
 
+    def _celdaLegible(self, word):
+        if word == 0:
+            return ''
+        if word & OPCODE_MASK in _MNEMONICS:
+            return ASM.decode(word)
+        return word
+
+
+## emulates the main memory (RAM) mapped onto a local file (mmap)
+## las celdas no ocupan el heap de Python, y si el archivo ya existe
+## se reabre la "imagen" de la RAM de una corrida anterior
+class MappedMemory(Memory):
+
+    def __init__(self, size, path):
+        self._size = size
+        self._path = path
+        nbytes = size * array(MEMORY_TYPECODE).itemsize
+        self._file = open(path, 'a+b')
+        if os.path.getsize(path) != nbytes:
+            self._file.truncate(nbytes)
+        self._mmap = mmap.mmap(self._file.fileno(), nbytes)
+        self._view = memoryview(self._mmap).cast(MEMORY_TYPECODE)
+        self._cells = self._view
+
+    @property
+    def path(self):
+        return self._path
+
+    def flush(self):
+        self._mmap.flush()
+
+    ## read_block devuelve vistas sin copiar sobre el mmap: mientras alguna siga
+    ## viva el mmap no se puede cerrar. En ese caso close levanta una excepcion
+    ## antes de desarmar nada y la memoria sigue abierta y usable
+    def close(self):
+        if self._mmap.closed:
+            return
+        self.flush()
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            self._view = memoryview(self._mmap).cast(MEMORY_TYPECODE)
+            self._cells = self._view
+            raise Exception("Memory file {path} is still in use: release the read_block views before closing it".format(path = self._path))
+        self._cells = None
+        self._file.close()
+
+##  Politicas de reemplazo de la TLB
+TLB_FIFO = 'FIFO'
+TLB_LRU = 'LRU'
+
 ## emulates the Memory Management Unit (MMU)
+##
+## El MMU tiene un registro que apunta a la page table del proceso en
+## ejecucion (la carga el Dispatcher) y una TLB de capacidad fija que
+## cachea las ultimas traducciones. Ante un miss, el MMU recorre la page
+## table y el CPU queda "trabado" missPenalty ticks.
+## Las entradas de la TLB estan marcadas con el ASID (address space id) del
+## proceso, asi un context switch solo cambia el ASID activo y no hace falta
+## vaciar la TLB: las entradas de otros procesos siguen ahi hasta ser desalojadas.
+## Si la pagina no esta en la page table, el MMU levanta un #PAGE_FAULT para
+## que el kernel la cargue y reintenta la traduccion.
+## Por cada frame se registran los bits R (referenciado) y M (modificado),
+## el tick de carga y el de su ultima referencia (los usan los algoritmos de
+## seleccion de victima). Se guardan en arrays compactos indexados por frame.
 class MMU():
 
-    def __init__(self, memory):
+    def __init__(self, memory, interruptVector):
         self._memory = memory
+        self._interruptVector = interruptVector
         self._frameSize = 0
         self._limit = 999
-        self._tlb = dict()
+        self._pageTable = dict()
+        self._asid = 0
+        self._tlb = OrderedDict()
+        self._tlbSize = 16
+        self._tlbPolicy = TLB_LRU
+        self._missPenalty = 0
+        self._pendingPenalty = 0
+        self._hits = 0
+        self._misses = 0
+        self._flushes = 0
+        self._pageFaults = 0
+        self._now = 0
+        self._translate = self._translateDiv
+        ## None si el tamanio de frame no es potencia de 2 (se traduce dividiendo)
+        self._pageShift = None
+        self._offsetMask = 0
+        self._referenced = bytearray(0)
+        self._modified = bytearray(0)
+        self._readOnly = bytearray(0)
+        self._loadTime = array('q')
+        self._lastReference = array('q')
+
+    ## el MMU solo usa el clock para saber "cuando" se referencia cada frame
+    def tick(self, tickNbr):
+        self._now = tickNbr
+
+    def nextEventTick(self, tickNbr):
+        return None
+
+    def skipTicks(self, fromTick, toTick):
+        self._now = toTick - 1
 
     @property
     def limit(self):
@@ -159,33 +412,312 @@ class MMU():
     @frameSize.setter
     def frameSize(self, frameSize):
         self._frameSize = frameSize
+        if frameSize & (frameSize - 1) == 0:
+            ## potencia de 2: pagina = dir >> shift, offset = dir & mask
+            self._pageShift = frameSize.bit_length() - 1
+            self._offsetMask = frameSize - 1
+            self._translate = self._translateShift
+        else:
+            self._pageShift = None
+            self._translate = self._translateDiv
+        frames = self._memory.size // frameSize
+        self._referenced = bytearray(frames)
+        self._modified = bytearray(frames)
+        self._readOnly = bytearray(frames)
+        self._loadTime = array('q', [-1]) * frames
+        self._lastReference = array('q', [-1]) * frames
+
+    ## el kernel avisa que cargo una pagina nueva en el frame
+    def frameLoaded(self, frameId):
+        self._referenced[frameId] = 0
+        self._modified[frameId] = 0
+        self._loadTime[frameId] = self._now
+        self._lastReference[frameId] = -1
+
+    ## bit de referencia del frame (lo prende cada acceso)
+    def referenced(self, frameId):
+        return self._referenced[frameId] == 1
+
+    def clearReferenced(self, frameId):
+        self._referenced[frameId] = 0
+
+    ## borra los bits R de todos los frames de una sola vez
+    def clearReferencedBits(self):
+        self._referenced[:] = bytes(len(self._referenced))
+
+    ## bit de modificacion del frame (lo prende cada escritura)
+    def modified(self, frameId):
+        return self._modified[frameId] == 1
+
+    def clearModified(self, frameId):
+        self._modified[frameId] = 0
+
+    ## frames de solo lectura (las paginas que se pueden compartir entre procesos)
+    def readOnly(self, frameId):
+        return self._readOnly[frameId] == 1
+
+    def setReadOnly(self, frameId, readOnly):
+        self._readOnly[frameId] = 1 if readOnly else 0
+
+    ## tick en que se cargo la pagina que esta en el frame
+    def loadTime(self, frameId):
+        return self._loadTime[frameId]
+
+    ## tick del ultimo acceso al frame (-1 si nunca se accedio)
+    def lastReference(self, frameId):
+        return self._lastReference[frameId]
+
+    ## page table del proceso en ejecucion (pageId -> frameId)
+    @property
+    def pageTable(self):
+        return self._pageTable
+
+    @pageTable.setter
+    def pageTable(self, pageTable):
+        self._pageTable = pageTable
+
+    ## address space id del proceso en ejecucion (el kernel usa el pid)
+    @property
+    def asid(self):
+        return self._asid
+
+    @asid.setter
+    def asid(self, asid):
+        self._asid = asid
+        self._pendingPenalty = 0
+
+    @property
+    def tlbSize(self):
+        return self._tlbSize
+
+    ## tlbSize = 0: sin TLB, cada acceso recorre la page table
+    @tlbSize.setter
+    def tlbSize(self, tlbSize):
+        if tlbSize < 0:
+            raise Exception("Invalid TLB size: {size}".format(size = tlbSize))
+        self._tlbSize = tlbSize
+        while len(self._tlb) > self._tlbSize:
+            self._tlb.popitem(last=False)
+
+    @property
+    def tlbPolicy(self):
+        return self._tlbPolicy
+
+    @tlbPolicy.setter
+    def tlbPolicy(self, tlbPolicy):
+        if tlbPolicy not in (TLB_FIFO, TLB_LRU):
+            raise Exception("Unknown TLB replacement policy: {policy}".format(policy = tlbPolicy))
+        self._tlbPolicy = tlbPolicy
+
+    ## ticks que tarda recorrer la page table ante un miss de la TLB
+    @property
+    def missPenalty(self):
+        return self._missPenalty
+
+    @missPenalty.setter
+    def missPenalty(self, missPenalty):
+        self._missPenalty = missPenalty
+
+    @property
+    def tlbHits(self):
+        return self._hits
+
+    @property
+    def tlbMisses(self):
+        return self._misses
+
+    @property
+    def tlbFlushes(self):
+        return self._flushes
+
+    @property
+    def pageFaults(self):
+        return self._pageFaults
+
+    def resetTLBStats(self):
+        self._hits = 0
+        self._misses = 0
+        self._flushes = 0
+        self._pageFaults = 0
 
     def resetTLB(self):
-        self._tlb = dict()
+        self._tlb.clear()
+        self._pendingPenalty = 0
+        self._flushes += 1
+
+    ## descarta las entradas de la TLB de un address space (ej: proceso terminado)
+    def invalidateASID(self, asid):
+        for key in [key for key in self._tlb if key[0] == asid]:
+            del self._tlb[key]
+
+    ## descarta la entrada de la TLB de una pagina (ej: la page table cambio)
+    def invalidatePage(self, asid, pageId):
+        self._tlb.pop((asid, pageId), None)
 
     def setPageFrame(self, pageId, frameId):
-        self._tlb[pageId] = frameId
+        self._pageTable[pageId] = frameId
+        self.invalidatePage(self._asid, pageId)
+
+    ## devuelve (y olvida) los ticks de penalidad de los misses ocurridos
+    def takeMissPenalty(self):
+        penalty = self._pendingPenalty
+        self._pendingPenalty = 0
+        return penalty
+
+    def _walkPageTable(self, pageId):
+        self._misses += 1
+        frameId = self._pageTable.get(pageId)
+        if frameId is None:
+            ## la pagina no esta en memoria: que el kernel la cargue
+            self._pageFaults += 1
+            pageFaultIRQ = IRQ(PAGE_FAULT_INTERRUPTION_TYPE, pageId)
+            self._interruptVector.handle(pageFaultIRQ)
+            frameId = self._pageTable.get(pageId)
+        if frameId is None:
+            raise Exception("\n*\n* ERROR \n*\n Error en el MMU\nNo se cargo la pagina  {pageId}".format(pageId = str(pageId)))
+        if self._tlbSize > 0:
+            if len(self._tlb) >= self._tlbSize:
+                ## la TLB esta llena: sale la entrada mas vieja (FIFO) o la menos usada (LRU)
+                self._tlb.popitem(last=False)
+            self._tlb[(self._asid, pageId)] = frameId
+        self._pendingPenalty += self._missPenalty
+        return frameId
 
     def fetch(self,  logicalAddress):
-        if (logicalAddress > self._limit):
-            raise Exception("Invalid Address,  {logicalAddress} is higher than process limit: {limit}".format(limit = self._limit, logicalAddress = logicalAddress))
+        # obtenemos la instrucción alocada en esa direccion
+        return self._memory.read(self._translate(logicalAddress))
+
+    ## escribe en la memoria del proceso en ejecucion (prende el bit M).
+    ## Si el frame es de solo lectura levanta un #COPY_ON_WRITE para que el
+    ## kernel le de al proceso un frame propio y reintenta la escritura
+    def write(self, logicalAddress, value):
+        physicalAddress = self._translate(logicalAddress)
+        frameId = physicalAddress // self._frameSize
+        if self._readOnly[frameId]:
+            copyOnWriteIRQ = IRQ(COPY_ON_WRITE_INTERRUPTION_TYPE, logicalAddress // self._frameSize)
+            self._interruptVector.handle(copyOnWriteIRQ)
+            physicalAddress = self._translate(logicalAddress)
+            frameId = physicalAddress // self._frameSize
+            if self._readOnly[frameId]:
+                raise Exception("Invalid write, address {logicalAddress} is in read-only frame {frameId}".format(logicalAddress = logicalAddress, frameId = frameId))
+        self._modified[frameId] = 1
+        self._memory.write(physicalAddress, value)
+
+    ## traduce la direccion logica a fisica registrando el acceso
+    ## (_translate apunta a esta o a _translateShift, segun el frameSize)
+    def _translateDiv(self, logicalAddress):
         #
         # calculamos la pagina y el offset correspondiente a la direccion logica recibida 
-        pageId = logicalAddress // self._frameSize
-        offset = logicalAddress % self._frameSize
+        pageId, offset = divmod(logicalAddress, self._frameSize)
         #
         # buscamos la direccion Base del frame donde esta almacenada la pagina
-        try:
-            frameId = self._tlb[pageId]
-        except:
-            raise Exception("\n*\n* ERROR \n*\n Error en el MMU\nNo se cargo la pagina  {pageId}".format(pageId = str(pageId)))
+        # primero en la TLB; si no esta (o la direccion es invalida) vamos por el camino lento
+        key = (self._asid, pageId)
+        frameId = self._tlb.get(key)
+        if frameId is None or logicalAddress > self._limit:
+            frameId = self._translateSlow(logicalAddress, pageId)
+        else:
+            self._hits += 1
+            if self._tlbPolicy == TLB_LRU:
+                self._tlb.move_to_end(key)
+        self._referenced[frameId] = 1
+        self._lastReference[frameId] = self._now
         #
         ##calculamos la direccion fisica resultante
-        frameBaseDir  = self._frameSize * frameId
-        physicalAddress = frameBaseDir + offset
+        return self._frameSize * frameId + offset
+
+    ## igual a _translateDiv, pero la pagina y el offset salen de un shift y una mascara
+    def _translateShift(self, logicalAddress):
+        pageId = logicalAddress >> self._pageShift
+        key = (self._asid, pageId)
+        frameId = self._tlb.get(key)
+        if frameId is None or logicalAddress > self._limit:
+            frameId = self._translateSlow(logicalAddress, pageId)
+        else:
+            self._hits += 1
+            if self._tlbPolicy == TLB_LRU:
+                self._tlb.move_to_end(key)
+        self._referenced[frameId] = 1
+        self._lastReference[frameId] = self._now
+        return (frameId << self._pageShift) | (logicalAddress & self._offsetMask)
+
+    ## miss de la TLB o direccion fuera del limite del proceso
+    def _translateSlow(self, logicalAddress, pageId):
+        if (logicalAddress > self._limit):
+            raise Exception("Invalid Address,  {logicalAddress} is higher than process limit: {limit}".format(limit = self._limit, logicalAddress = logicalAddress))
+        return self._walkPageTable(pageId)
+
+    ## como fetch pero sin efectos (no toca la TLB ni los contadores).
+    ## Si un miss cuesta ticks, solo traduce las paginas que estan en la TLB.
+    ## Devuelve None si no se puede traducir la direccion.
+    def peek(self, logicalAddress):
+        if (logicalAddress > self._limit):
+            return None
+        if self._pageShift is None:
+            pageId, offset = divmod(logicalAddress, self._frameSize)
+        else:
+            pageId = logicalAddress >> self._pageShift
+            offset = logicalAddress & self._offsetMask
+        frameId = self._tlb.get((self._asid, pageId))
+        if frameId is None and self._missPenalty == 0:
+            frameId = self._pageTable.get(pageId)
+        if frameId is None:
+            return None
+        return self._memory.read(self._frameSize * frameId + offset)
+
+    ## traduce muchas direcciones logicas de una sola vez (operaciones de numpy).
+    ## Usa la page table activa y no tiene efectos: no toca la TLB, los bits ni
+    ## los contadores, y no levanta #PAGE_FAULT.
+    ## Devuelve (direcciones fisicas, mascara de faults): las direcciones fuera del
+    ## limite o de paginas que no estan en memoria tienen fault=True y fisica=-1.
+    def translate_many(self, logicalAddresses):
+        if numpy is None:
+            raise Exception("MMU.translate_many requires numpy")
+        addresses = numpy.asarray(logicalAddresses, dtype=numpy.int64)
         #
-        # obtenemos la instrucción alocada en esa direccion
-        return self._memory.read(physicalAddress)
+        # la page table como array: pageId -> frameId (-1 si no esta cargada)
+        pages = self._limit // self._frameSize + 1
+        table = numpy.full(pages, -1, dtype=numpy.int64)
+        if self._pageTable:
+            pageIds = numpy.fromiter(self._pageTable.keys(), dtype=numpy.int64, count=len(self._pageTable))
+            frameIds = numpy.fromiter(self._pageTable.values(), dtype=numpy.int64, count=len(self._pageTable))
+            inRange = pageIds < pages
+            table[pageIds[inRange]] = frameIds[inRange]
+        #
+        valid = (addresses >= 0) & (addresses <= self._limit)
+        pageIds, offsets = numpy.divmod(numpy.where(valid, addresses, 0), self._frameSize)
+        frameIds = table[pageIds]
+        faults = ~valid | (frameIds < 0)
+        physical = numpy.where(faults, -1, frameIds * self._frameSize + offsets)
+        return physical, faults
+
+    ## registra "count" fetchs consecutivos a partir de logicalAddress, uno por
+    ## tick desde fromTick (las direcciones tienen que haber sido validadas con peek).
+    ## Deja la TLB, los bits y los contadores igual que si se hubieran hecho de a uno.
+    def touch(self, logicalAddress, count, fromTick):
+        lastAddress = logicalAddress + count - 1
+        if self._pageShift is None:
+            firstPage, lastPage = logicalAddress // self._frameSize, lastAddress // self._frameSize
+        else:
+            firstPage, lastPage = logicalAddress >> self._pageShift, lastAddress >> self._pageShift
+        for pageId in range(firstPage, lastPage + 1):
+            lastAccess = min(lastAddress, (pageId + 1) * self._frameSize - 1)
+            accesses = lastAccess - max(logicalAddress, pageId * self._frameSize) + 1
+            key = (self._asid, pageId)
+            if key in self._tlb:
+                frameId = self._tlb[key]
+                self._hits += accesses
+                if self._tlbPolicy == TLB_LRU:
+                    self._tlb.move_to_end(key)
+            elif self._tlbSize > 0:
+                frameId = self._walkPageTable(pageId)
+                self._hits += accesses - 1
+            else:
+                ## sin TLB todos los accesos son misses (el primero puede traer la pagina)
+                frameId = self._walkPageTable(pageId)
+                self._misses += accesses - 1
+            self._referenced[frameId] = 1
+            self._lastReference[frameId] = fromTick + lastAccess - logicalAddress
 
 
 ## emulates the main Central Processor Unit
@@ -196,33 +728,82 @@ class Cpu():
         self._interruptVector = interruptVector
         self._pc = -1
         self._ir = None
+        self._burstEnd = -1
+        self._stallTicks = 0
+        ## tabla de despacho: el opcode es el indice de la operacion a ejecutar
+        self._operations = [self._executeInvalid] * (OPCODE_MASK + 1)
+        self._operations[OPCODE_CPU] = self._executeCPU
+        self._operations[OPCODE_IO] = self._executeIO
+        self._operations[OPCODE_EXIT] = self._executeEXIT
+        self._operation = None
 
     def tick(self, tickNbr):
-        if (self.isBusy()):
-            self._fetch()
-            self._decode()
-            self._execute()
-        else:
+        if not self.isBusy():
             log.logger.info("cpu - NOOP")
+        elif self._stallTicks > 0:
+            self._stallTicks -= 1
+            log.logger.info("cpu - STALL: TLB miss, PC={pc}".format(pc=self._pc))
+        else:
+            self._fetch()
+            if self._ir is not None:
+                self._decode()
+                self._execute()
 
     def _fetch(self):
         self._ir = self._mmu.fetch(self._pc)
+        penalty = self._mmu.takeMissPenalty()
+        if penalty > 0:
+            ## TLB miss: este tick y los siguientes se van en recorrer la page table,
+            ## despues se vuelve a hacer el fetch (que ya es un hit)
+            self._ir = None
+            self._stallTicks = penalty - 1
+            log.logger.info("cpu - STALL: TLB miss, PC={pc}".format(pc=self._pc))
+            return
         self._pc += 1
 
     def _decode(self):
-        ## decode no hace nada en este caso
-        pass
+        self._operation = self._operations[self._ir & OPCODE_MASK]
 
     def _execute(self):
-        if ASM.isEXIT(self._ir):
-            killIRQ = IRQ(KILL_INTERRUPTION_TYPE)
-            self._interruptVector.handle(killIRQ)
-        elif ASM.isIO(self._ir):
-            ioInIRQ = IRQ(IO_IN_INTERRUPTION_TYPE, self._ir)
-            self._interruptVector.handle(ioInIRQ)
-        else:
-            log.logger.info("cpu - Exec: {instr}, PC={pc}".format(instr=self._ir, pc=self._pc))
-
+        self._operation()
+
+    def _executeEXIT(self):
+        killIRQ = IRQ(KILL_INTERRUPTION_TYPE)
+        self._interruptVector.handle(killIRQ)
+
+    def _executeIO(self):
+        ioInIRQ = IRQ(IO_IN_INTERRUPTION_TYPE, ASM.decode(self._ir))
+        self._interruptVector.handle(ioInIRQ)
+
+    def _executeCPU(self):
+        log.logger.info("cpu - Exec: {instr}, PC={pc}".format(instr=INSTRUCTION_CPU, pc=self._pc))
+
+    def _executeInvalid(self):
+        raise Exception("Invalid instruction {ir} at PC={pc}".format(ir = self._ir, pc = self._pc - 1))
+
+    ## cantidad de instrucciones CPU "planas" consecutivas a partir del PC,
+    ## es decir, las que se pueden ejecutar de corrido sin generar IRQs
+    def burstLength(self):
+        if not self.isBusy() or self._stallTicks > 0:
+            return 0
+        if self._pc >= self._burstEnd:
+            ## si un miss de la TLB cuesta ticks (o la direccion es invalida),
+            ## la rafaga se corta ahi: lo tiene que resolver el tick normal
+            self._burstEnd = self._pc
+            word = self._mmu.peek(self._burstEnd)
+            while word is not None and word & OPCODE_MASK == OPCODE_CPU:
+                self._burstEnd += 1
+                word = self._mmu.peek(self._burstEnd)
+        return self._burstEnd - self._pc
+
+    ## ejecuta una rafaga de instrucciones CPU en un solo paso
+    ## (equivale a los ticks fromTick..toTick-1 ejecutando instrucciones CPU)
+    def burst(self, fromTick, toTick):
+        ticks = toTick - fromTick
+        self._mmu.touch(self._pc, ticks, fromTick)
+        self._pc += ticks
+        self._ir = ASM.encode(INSTRUCTION_CPU)
+        log.logger.info("cpu - Exec burst: {ticks} x {instr}, PC={pc}".format(ticks=ticks, instr=INSTRUCTION_CPU, pc=self._pc))
 
     def isBusy(self):
         return self._pc > -1
@@ -234,6 +815,9 @@ class Cpu():
     @pc.setter
     def pc(self, addr):
         self._pc = addr
+        ## cambio el proceso (o su PC): hay que volver a calcular la rafaga
+        self._burstEnd = -1
+        self._stallTicks = 0
 
     def __repr__(self):
         return "CPU(PC={pc})".format(pc=self._pc)
@@ -241,9 +825,10 @@ class Cpu():
 ## emulates an Input/output device of the Hardware
 class AbstractIODevice():
 
-    def __init__(self, deviceId, deviceTime):
+    def __init__(self, deviceId, deviceTime, interruptVector):
         self._deviceId = deviceId
         self._deviceTime = deviceTime
+        self._interruptVector = interruptVector
         self._busy = False
 
     @property
@@ -274,14 +859,24 @@ class AbstractIODevice():
                 ## operation execution has finished
                 self._busy = False
                 ioOutIRQ = IRQ(IO_OUT_INTERRUPTION_TYPE, self._deviceId)
-                HARDWARE.interruptVector.handle(ioOutIRQ)
+                self._interruptVector.handle(ioOutIRQ)
             else:
                 log.logger.info("device {deviceId} - Busy: {ticksCount} of {deviceTime}".format(deviceId = self.deviceId, ticksCount = self._ticksCount, deviceTime = self._deviceTime))
 
+    ## el proximo evento es el tick en que termina la operacion actual
+    def nextEventTick(self, tickNbr):
+        if (self._busy):
+            return tickNbr + self._deviceTime - self._ticksCount
+        return None
+
+    def skipTicks(self, fromTick, toTick):
+        if (self._busy):
+            self._ticksCount += toTick - fromTick
+
 
 class PrinterIODevice(AbstractIODevice):
-    def __init__(self):
-        super(PrinterIODevice, self).__init__("Printer", 3)
+    def __init__(self, interruptVector):
+        super(PrinterIODevice, self).__init__("Printer", 3, interruptVector)
 
 
 class Timer:
@@ -306,6 +901,22 @@ class Timer:
     def reset(self):
            self._tickCount = 0
 
+    ## con el CPU ocioso no hay timeout posible ni instrucciones para ejecutar;
+    ## con el CPU ocupado el proximo evento es el fin de la rafaga de
+    ## instrucciones CPU o el fin del quantum, lo que llegue primero
+    def nextEventTick(self, tickNbr):
+        if not self._cpu.isBusy():
+            return None
+        ticks = self._cpu.burstLength()
+        if self._active:
+            ticks = min(ticks, max(0, self._quantum - self._tickCount))
+        return tickNbr + ticks
+
+    def skipTicks(self, fromTick, toTick):
+        self._tickCount += toTick - fromTick
+        if self._cpu.isBusy():
+            self._cpu.burst(fromTick, toTick)
+
     @property
     def quantum(self):
         return self._quantum
@@ -320,26 +931,43 @@ class Timer:
 class Hardware():
 
     ## Setup our hardware
-    def setup(self, memorySize):
+    ## clockRate: ticks por segundo (CLOCK_REAL_TIME, CLOCK_TURBO o cualquier otro valor)
+    ## eventDriven: el clock saltea los ticks en los que ningun componente tiene trabajo
+    ## memoryFile: si se indica, la RAM se mapea sobre ese archivo (MappedMemory)
+    def setup(self, memorySize, clockRate = CLOCK_REAL_TIME, eventDriven = False, memoryFile = None):
         ## add the components to the "motherboard"
-        self._memory = Memory(memorySize)
+        if memoryFile is None:
+            self._memory = Memory(memorySize)
+        else:
+            self._memory = MappedMemory(memorySize, memoryFile)
         self._interruptVector = InterruptVector()
-        self._clock = Clock()
-        self._ioDevice = PrinterIODevice()
-        self._mmu = MMU(self._memory)
+        self._clock = Clock(clockRate, eventDriven)
+        self._ioDevice = PrinterIODevice(self._interruptVector)
+        self._mmu = MMU(self._memory, self._interruptVector)
         self._cpu = Cpu(self._mmu, self._interruptVector)
         self._timer = Timer(self._cpu, self._interruptVector)
         self._clock.addSubscriber(self._ioDevice)
+        self._clock.addSubscriber(self._mmu)
         self._clock.addSubscriber(self._timer)
 
-    def switchOn(self):
+    ## clockRate permite cambiar la velocidad elegida en el setup
+    def switchOn(self, clockRate = None):
         log.logger.info(" ---- SWITCH ON ---- ")
+        if clockRate is not None:
+            self.clock.ticksPerSecond = clockRate
         return self.clock.start()
 
     def switchOff(self):
         self.clock.stop()
         log.logger.info(" ---- SWITCH OFF ---- ")
 
+    ## baja y cierra el archivo de la memoria (si esta mapeada a un archivo).
+    ## El kernel apaga el hardware cada vez que terminan todos los procesos, pero
+    ## despues puede llegar otro: solo se cierra cuando ya no se va a usar la maquina
+    def close(self):
+        self.clock.stop()
+        self._memory.close()
+
     @property
     def cpu(self):
         return self._cpu
@@ -373,5 +1001,7 @@ class Hardware():
 
 ### HARDWARE is a global variable
 ### can be access from any
+### es la maquina que usa el Kernel si no se le pasa otra: para tener varias
+### maquinas en el mismo proceso se crea un Hardware() por cada Kernel
 HARDWARE = Hardware()
 
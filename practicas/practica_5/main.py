@@ -10,15 +10,15 @@ if __name__ == '__main__':
     log.setupLogger()
     log.logger.info('Starting emulator')
 
-    ## setup our hardware and set memory size to 25 "cells"
-    HARDWARE.setup(25)
+    ## setup our hardware and set memory size to 32 "cells"
+    HARDWARE.setup(32)
 
     ## Switch on computer
     HARDWARE.switchOn()
 
     ## new create the Operative System Kernel
     # "booteamos" el sistema operativo
-    kernel = Kernel()
+    kernel = Kernel(HARDWARE)
 
     # Ahora vamos a intentar ejecutar 3 programas a la vez
     ##################
@@ -26,10 +26,15 @@ if __name__ == '__main__':
     prg2 = Program("prg2.exe", [ASM.CPU(7)])
     prg3 = Program("prg3.exe", [ASM.CPU(4), ASM.IO(), ASM.CPU(1)])
 
+    # "grabamos" los programas en el file system
+    kernel.fileSystem.write("c:/prg1.exe", prg1)
+    kernel.fileSystem.write("c:/prg2.exe", prg2)
+    kernel.fileSystem.write("c:/prg3.exe", prg3)
+
     # execute all programs "concurrently"
-    kernel.run(prg1)
-    kernel.run(prg2)
-    kernel.run(prg3)
+    kernel.run("c:/prg1.exe", 3)
+    kernel.run("c:/prg2.exe", 1)
+    kernel.run("c:/prg3.exe", 2)
 
 
 
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+
+from tabulate import tabulate
+from so import ESTADOS, READY, RUNNING, TERMINATED
+
+try:
+    import numpy
+except ImportError:
+    ## numpy es opcional: sin numpy las cuentas se hacen con loops sobre los intervalos
+    numpy = None
+
+
+## metricas de planificacion a partir de un Gantt (ver parcial/scheduler/gantt_schedulers.md).
+## Cada fila del Gantt es un tick:
+##  - tiempo de espera: ticks que el proceso estuvo en READY
+##  - tiempo de retorno: desde que se lanzo hasta el primer tick en TERMINATED
+##  - tiempo de respuesta: desde que se lanzo hasta el primer tick en RUNNING
+##  - uso de CPU: proporcion de ticks con algun proceso en RUNNING
+##  - throughput: procesos terminados por tick
+## La corrida dura hasta que termina el ultimo proceso (o todo el Gantt si alguno
+## no termino). Las cuentas se hacen sobre los intervalos de estado del Gantt, no
+## tick por tick. Los promedios son sobre los procesos que terminaron
+class Metricas():
+
+    def __init__(self, gantt):
+        self._ticks = gantt.ticks
+        self._pids = sorted(gantt.pids())
+        intervalos = [(pid, desde, hasta, estado) for pid in self._pids for desde, hasta, estado in gantt.intervalos(pid)]
+        if numpy is None:
+            self._calcularConLoops(intervalos)
+        else:
+            self._calcularConNumpy(intervalos)
+
+    def _calcularConNumpy(self, intervalos):
+        cantidad = len(self._pids)
+        sinValor = numpy.iinfo(numpy.int64).max
+        pids = numpy.array([intervalo[0] for intervalo in intervalos], dtype=numpy.int64)
+        desde = numpy.array([intervalo[1] for intervalo in intervalos], dtype=numpy.int64)
+        hasta = numpy.array([intervalo[2] for intervalo in intervalos], dtype=numpy.int64)
+        estados = numpy.array([ESTADOS.index(intervalo[3]) for intervalo in intervalos], dtype=numpy.int8)
+        indices = numpy.searchsorted(numpy.array(self._pids, dtype=numpy.int64), pids)
+        duraciones = hasta - desde
+
+        enReady = estados == ESTADOS.index(READY)
+        enRunning = estados == ESTADOS.index(RUNNING)
+        terminado = estados == ESTADOS.index(TERMINATED)
+
+        espera = numpy.bincount(indices[enReady], weights=duraciones[enReady], minlength=cantidad)
+        llegada = numpy.full(cantidad, sinValor, dtype=numpy.int64)
+        numpy.minimum.at(llegada, indices, desde)
+        primeraEjecucion = numpy.full(cantidad, sinValor, dtype=numpy.int64)
+        numpy.minimum.at(primeraEjecucion, indices[enRunning], desde[enRunning])
+        fin = numpy.full(cantidad, sinValor, dtype=numpy.int64)
+        numpy.minimum.at(fin, indices[terminado], desde[terminado])
+
+        self._espera = [int(ticks) for ticks in espera]
+        self._fin = [None if f == sinValor else int(f) for f in fin]
+        self._retorno = [None if f == sinValor else int(f - l) for f, l in zip(fin, llegada)]
+        self._respuesta = [None if p == sinValor else int(p - l) for p, l in zip(primeraEjecucion, llegada)]
+        self._ticksEnCpu = int(duraciones[enRunning].sum())
+
+    def _calcularConLoops(self, intervalos):
+        posicion = {pid: indice for indice, pid in enumerate(self._pids)}
+        espera = [0] * len(self._pids)
+        llegada = [None] * len(self._pids)
+        primeraEjecucion = [None] * len(self._pids)
+        fin = [None] * len(self._pids)
+        self._ticksEnCpu = 0
+        for pid, desde, hasta, estado in intervalos:
+            indice = posicion[pid]
+            if llegada[indice] is None:
+                llegada[indice] = desde
+            if estado == READY:
+                espera[indice] += hasta - desde
+            elif estado == RUNNING:
+                self._ticksEnCpu += hasta - desde
+                if primeraEjecucion[indice] is None:
+                    primeraEjecucion[indice] = desde
+            elif estado == TERMINATED and fin[indice] is None:
+                fin[indice] = desde
+        self._espera = espera
+        self._fin = fin
+        self._retorno = [None if f is None else f - l for f, l in zip(fin, llegada)]
+        self._respuesta = [None if p is None else p - l for p, l in zip(primeraEjecucion, llegada)]
+
+    def _terminados(self):
+        return [indice for indice, retorno in enumerate(self._retorno) if retorno is not None]
+
+    def _promedio(self, valores):
+        terminados = self._terminados()
+        if not terminados:
+            return None
+        return sum(valores[indice] for indice in terminados) / len(terminados)
+
+    @property
+    def pids(self):
+        return self._pids
+
+    @property
+    def ticks(self):
+        return self._ticks
+
+    def espera(self, pid):
+        return self._espera[self._pids.index(pid)]
+
+    ## None si el proceso no termino
+    def retorno(self, pid):
+        return self._retorno[self._pids.index(pid)]
+
+    ## None si el proceso nunca corrio
+    def respuesta(self, pid):
+        return self._respuesta[self._pids.index(pid)]
+
+    def esperaPromedio(self):
+        return self._promedio(self._espera)
+
+    def retornoPromedio(self):
+        return self._promedio(self._retorno)
+
+    def respuestaPromedio(self):
+        return self._promedio(self._respuesta)
+
+    def terminados(self):
+        return len(self._terminados())
+
+    ## ticks hasta que termino el ultimo proceso
+    def duracion(self):
+        if not self._pids or None in self._fin:
+            return self._ticks
+        return max(self._fin)
+
+    def usoDeCpu(self):
+        duracion = self.duracion()
+        return self._ticksEnCpu / duracion if duracion else 0
+
+    def throughput(self):
+        duracion = self.duracion()
+        return self.terminados() / duracion if duracion else 0
+
+    ## la tabla de tiempos por proceso como en parcial/scheduler/gantt_schedulers.md
+    def __repr__(self):
+        filas = [[pid, espera, retorno, respuesta] for pid, espera, retorno, respuesta in zip(self._pids, self._espera, self._retorno, self._respuesta)]
+        filas.append(['PROMEDIO', self.esperaPromedio(), self.retornoPromedio(), self.respuestaPromedio()])
+        tabla = tabulate(filas, headers=['Proceso', 'T. Espera', 'T. Retorno', 'T. Respuesta'], tablefmt='pipe')
+        return "{tabla}\n\n Uso de CPU: {uso:.2%}   Throughput: {throughput:.4f} procesos/tick".format(tabla=tabla, uso=self.usoDeCpu(), throughput=self.throughput())
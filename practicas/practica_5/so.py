@@ -1 +1,1295 @@
-### Reemplazarlo con el so.py de la practica anterior
\ No newline at end of file
+#!/usr/bin/env python
+
+from hardware import *
+from collections import OrderedDict, deque
+from collections.abc import Mapping
+from types import MappingProxyType
+import heapq
+import csv
+import json
+from array import array
+import log
+
+try:
+    import numpy
+except ImportError:
+    ## numpy es opcional: solo lo usa PCBTablaColumnar para las consultas masivas
+    numpy = None
+
+RUNNING= 'RUNNING'
+TERMINATED= 'TERMINATED'
+WAITING= 'WAITING'
+NEW= 'NEW'
+READY = 'READY'
+## formatos de ExportadorDeEventos
+EXPORTAR_CSV = 'csv'
+EXPORTAR_JSONL = 'jsonl'
+## el codigo de cada estado es su posicion en ESTADOS
+ESTADOS = (NEW, READY, RUNNING, WAITING, TERMINATED)
+
+## tamaño de pagina/frame que usa el kernel para paginar la memoria
+FRAME_SIZE = 4
+
+
+## emulates a compiled program
+class Program():
+
+    def __init__(self, name, instructions):
+        self._name = name
+        self._instructions = self.expand(instructions)
+        self._code = None
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def instructions(self):
+        return self._instructions
+
+    ## el programa "compilado" a codigo de maquina, listo para copiar a memoria
+    @property
+    def code(self):
+        if self._code is None or len(self._code) != len(self._instructions):
+            self._code = ASM.assemble(self._instructions)
+        return self._code
+
+    def addInstr(self, instruction):
+        self._instructions.append(instruction)
+        self._code = None
+
+    def expand(self, instructions):
+        expanded = []
+        for i in instructions:
+            if isinstance(i, list):
+                ## is a list of instructions
+                expanded.extend(i)
+            else:
+                ## a single instr (a String)
+                expanded.append(i)
+
+        ## now test if last instruction is EXIT
+        ## if not... add an EXIT as final instruction
+        last = expanded[-1]
+        if not ASM.isEXIT(last):
+            expanded.append(INSTRUCTION_EXIT)
+
+        return expanded
+
+    def __repr__(self):
+        return "Program({name}, {instructions})".format(name=self._name, instructions=self._instructions)
+
+
+## emulates an Input/Output device controller (driver)
+class IoDeviceController():
+
+    def __init__(self, device):
+        self._device = device
+        self._waiting_queue = []
+        self._currentPCB = None
+
+
+    def runOperation(self, pcb, instruction):
+        pair = {'pcb': pcb, 'instruction': instruction}
+        pcb.state = WAITING
+        
+        if self._device.is_idle : 
+            self._device.execute(instruction)
+            self._currentPCB = pcb
+        else:    
+            self._waiting_queue.append(pair)
+        
+
+    def getFinishedPCB(self):
+        finishedPCB = self._currentPCB
+        self._currentPCB = None
+        return finishedPCB
+
+    
+    def sacarYEjecutar(self):
+        if (len(self._waiting_queue) > 0) and self._device.is_idle:
+            pair = self._waiting_queue.pop(0)
+            #print(pair)
+            pcb = pair['pcb']
+            instruction = pair['instruction']
+            self._currentPCB = pcb
+            self._device.execute(instruction)
+
+
+    def __repr__(self):
+        return "IoDeviceController for {deviceID} running: {currentPCB} waiting: {waiting_queue}".format(deviceID=self._device.deviceId, currentPCB=self._currentPCB, waiting_queue=self._waiting_queue)
+
+class waiting_queue():
+    def __init__(self):
+        self.pcbs = []
+    
+    def agregar(self,dic):
+        self.pcbs.append(dic)
+
+    def sacar(self):
+        return self.pcbs.pop(0)
+    def isEmpty(self):
+        return len(self.pcbs) == 0
+
+    
+## emulates the  Interruptions Handlers
+class AbstractInterruptionHandler():
+    def __init__(self, kernel):
+        self._kernel = kernel
+
+    @property
+    def kernel(self):
+        return self._kernel
+
+    def execute(self, irq):
+        log.logger.error("-- EXECUTE MUST BE OVERRIDEN in class {classname}".format(classname=self.__class__.__name__))
+
+
+class KillInterruptionHandler(AbstractInterruptionHandler):
+
+   def execute(self, irq):
+        log.logger.info(" Program Finished ")
+        log.logger.info(" que hay:{} ".format(irq))
+        
+
+
+        if self.kernel.pcbTable.pcbEnRunning() != None:
+            procesosCorriendo = self.kernel.pcbTable.pcbEnRunning()
+            self.kernel.dispatcher.save(procesosCorriendo)
+            ## liberamos los frames que ocupaba el programa y no usa nadie mas
+            frames = self.kernel.loader.soltar(procesosCorriendo)
+            self.kernel.memoryManager.freeFrames(frames)
+            self.kernel.seleccionDeVictima.liberados(frames)
+            for frameId in procesosCorriendo.pageTable.values():
+                usuarios = self.kernel.loader.usuarios(frameId)
+                if usuarios:
+                    self.kernel.seleccionDeVictima.reasignado(frameId, procesosCorriendo, usuarios[0])
+            self.kernel.hardware.mmu.invalidateASID(procesosCorriendo.pid)
+            ## despues de soltar la memoria: la tabla puede descartar la page table
+            procesosCorriendo.state = TERMINATED
+
+        if self.kernel.schaduler.hayElementosEnReadyQueve():
+
+            next_pcb = self.kernel.schaduler.next()
+            self.kernel.dispatcher.load(next_pcb)
+        elif self.kernel.pcbTable.todosLosProcesosTerminaron():
+            self.kernel.hardware.switchOff()
+            if self.kernel.exportador is not None:
+                self.kernel.exportador.cerrar()
+            ## el Gantt solo se arma si el log lo va a mostrar
+            log.logger.info("\n Gantt: %s", self.kernel.gantt)
+       
+                
+class IoInInterruptionHandler(AbstractInterruptionHandler):
+
+    def execute(self, irq):
+        operation = irq.parameters
+        pcbRunning = self.kernel.pcbTable.pcbEnRunning()
+
+        self.kernel.dispatcher.save(pcbRunning)
+
+        self.kernel.ioDeviceController.runOperation(pcbRunning,operation)
+
+        if self.kernel.schaduler.hayElementosEnReadyQueve():
+            next_pcb = self.kernel.schaduler.next()
+            self.kernel.dispatcher.load(next_pcb)
+
+        log.logger.info(self.kernel.ioDeviceController)
+
+class IoOutInterruptionHandler(AbstractInterruptionHandler):
+
+    def execute(self, irq):
+        pcb = self.kernel.ioDeviceController.getFinishedPCB()
+        self._kernel.ioDeviceController.sacarYEjecutar()
+        self.kernel.schaduler.add(pcb)
+        
+        log.logger.info(self.kernel.ioDeviceController)
+class HandlerTime(AbstractInterruptionHandler):
+
+    def execute(self, irq):
+        if self.kernel.schaduler.hayElementosEnReadyQueve():
+            if self.kernel.pcbTable.pcbEnRunning() != None:
+                pcbCorriendo = self.kernel.pcbTable.pcbEnRunning()
+                self.kernel.schaduler.expropiar(pcbCorriendo)
+                
+        self.kernel.hardware.timer.reset()
+
+class NewHandler(AbstractInterruptionHandler):
+
+   def execute(self,irq):
+        path = irq.parameters["path"]
+        prioridad = irq.parameters["prioridad"]
+
+        program = self.kernel.fileSystem.read(path)
+        pcb = PCB(dict(),path,prioridad,len(program.instructions))
+        pcb = self.kernel.pcbTable.cagarPcb(pcb)
+        ## con paginacion bajo demanda las paginas se cargan a medida que se necesitan (#PAGE_FAULT)
+        if not self.kernel.demandPaging:
+            cargadas = self._kernel.loader.load(program, pcb)
+            for pageId, frameId in cargadas.items():
+                self.kernel.seleccionDeVictima.cargado(frameId, pcb, pageId)
+        
+        self.kernel.schaduler.add(pcb)
+
+       
+        log.logger.info("\n Executing program: {name}".format(name=program.name))
+        log.logger.info("\n diccionario: {pcbTable}".format(pcbTable=pcb))
+        log.logger.info(self.kernel.hardware)
+
+class PageFaultInterruptionHandler(AbstractInterruptionHandler):
+
+    def execute(self, irq):
+        pageId = irq.parameters
+        pcb = self.kernel.pcbTable.pcbEnRunning()
+
+        if pageId not in pcb.swap and self.kernel.loader.compartir(pcb, pageId) is not None:
+            ## otro proceso del mismo programa ya tiene la pagina en memoria
+            log.logger.info(" Page fault: pid {pid} page {pageId} -> shared frame {frameId}".format(pid=pcb.pid, pageId=pageId, frameId=pcb.pageTable[pageId]))
+            return
+
+        frameId = self.kernel.frameLibre()
+
+        if pageId in pcb.swap:
+            ## la pagina se habia modificado: la traemos del swap
+            ## es una copia propia del proceso: se puede escribir
+            self.kernel.hardware.memory.write_block(frameId * self.kernel.hardware.mmu.frameSize, pcb.swap.pop(pageId))
+            self.kernel.hardware.mmu.setReadOnly(frameId, False)
+            pcb.pageTable[pageId] = frameId
+        else:
+            program = self.kernel.fileSystem.read(pcb.programPath)
+            self.kernel.loader.loadPage(program, pageId, frameId)
+            self.kernel.loader.registrar(pcb, pageId, frameId)
+        self.kernel.seleccionDeVictima.cargado(frameId, pcb, pageId)
+        log.logger.info(" Page fault: pid {pid} page {pageId} -> frame {frameId}".format(pid=pcb.pid, pageId=pageId, frameId=frameId))
+
+## el proceso en ejecucion quiere escribir en un frame de solo lectura (una
+## pagina que se puede compartir): copy on write. Si otros procesos la usan, el
+## que escribe se queda con una copia propia y los demas siguen con la original.
+## Si era el unico, la pagina deja de estar compartida y se escribe en el lugar
+class CopyOnWriteInterruptionHandler(AbstractInterruptionHandler):
+
+    def execute(self, irq):
+        pageId = irq.parameters
+        pcb = self.kernel.pcbTable.pcbEnRunning()
+        frameId = pcb.pageTable[pageId]
+        mmu = self.kernel.hardware.mmu
+
+        restantes = self.kernel.loader.separar(pcb, pageId, frameId)
+        if not restantes:
+            mmu.setReadOnly(frameId, False)
+            log.logger.info(" Copy on write: pid {pid} page {pageId} -> own frame {frameId}".format(pid=pcb.pid, pageId=pageId, frameId=frameId))
+            return
+
+        self.kernel.seleccionDeVictima.reasignado(frameId, pcb, restantes[0])
+        copia = self.kernel.frameLibre()
+        frameSize = mmu.frameSize
+        self.kernel.hardware.memory.write_block(copia * frameSize, self.kernel.hardware.memory.read_block(frameId * frameSize, frameSize))
+        pcb.pageTable[pageId] = copia
+        mmu.setReadOnly(copia, False)
+        mmu.invalidatePage(pcb.pid, pageId)
+        self.kernel.seleccionDeVictima.cargado(copia, pcb, pageId)
+        log.logger.info(" Copy on write: pid {pid} page {pageId} frame {frameId} -> copy in frame {copia}".format(pid=pcb.pid, pageId=pageId, frameId=frameId, copia=copia))
+
+# emulates the core of an Operative System
+## el hardware se recibe por parametro (por default la maquina global HARDWARE),
+## asi puede haber varios Hardware + Kernel independientes en el mismo proceso
+class Kernel():
+
+    def __init__(self, hardware = HARDWARE):
+        self._hardware = hardware
+        hardware.mmu.frameSize = FRAME_SIZE
+        self.fileSystem = FileSystem()
+        self.memoryManager = MemoryManager(hardware.memory.size // FRAME_SIZE)
+        # self.memoryManager = BuddyMemoryManager(hardware.memory.size // FRAME_SIZE)
+        self.loader = Loader(self.memoryManager, hardware)
+        self.pcbTable = PCBTable()
+        # self.pcbTable = PCBTablaColumnar()
+        self.dispatcher = Dispatcher(hardware)
+
+        ## paginacion bajo demanda y algoritmo de seleccion de victima
+        self.demandPaging = True
+        self.seleccionDeVictima = VictimaFIFO(self)
+        # self.seleccionDeVictima = VictimaLRU(self)
+        # self.seleccionDeVictima = VictimaSegundaChance(self)
+        # self.seleccionDeVictima = VictimaNRU(self)
+        # self.seleccionDeVictima = VictimaOptima(self)
+
+        ## borrado periodico de los bits R (desactivado por default)
+        self.resetBitsR = ResetBitsDeReferencia(hardware)
+        # self.resetBitsR.periodo = 10
+        
+        # self.schaduler = FCFS(self)
+        # self.schaduler = PrioridadNoExpropiativa(self)
+        self.schaduler = PrioridadExpropiativa(self)
+        # self.schaduler = Roundribin(self)
+        # hardware.timer.quantum=3
+        
+        self.gantt = Gantt(self)
+        hardware.clock.addSubscriber(self.gantt)
+        self.pcbTable.addSubscriber(self.gantt)
+
+        ## exportacion de los cambios de estado a un archivo (desactivada por default)
+        self.exportador = None
+        # self.exportarEventos("eventos.csv", EXPORTAR_CSV)
+        hardware.clock.addSubscriber(self.resetBitsR)
+        
+
+        killHandler = KillInterruptionHandler(self)
+        hardware.interruptVector.register(KILL_INTERRUPTION_TYPE, killHandler)
+
+        ioInHandler = IoInInterruptionHandler(self)
+        hardware.interruptVector.register(IO_IN_INTERRUPTION_TYPE, ioInHandler)
+
+        ioOutHandler = IoOutInterruptionHandler(self)
+        hardware.interruptVector.register(IO_OUT_INTERRUPTION_TYPE, ioOutHandler)
+
+        newInterruptionHandler = NewHandler(self)
+        hardware.interruptVector.register(NEW_INTERRUPTION_TYPE,newInterruptionHandler)
+        
+        handlerTime = HandlerTime(self)
+        hardware.interruptVector.register(TIMEOUT_INTERRUPTION_TYPE,handlerTime)
+
+        pageFaultHandler = PageFaultInterruptionHandler(self)
+        hardware.interruptVector.register(PAGE_FAULT_INTERRUPTION_TYPE,pageFaultHandler)
+
+        copyOnWriteHandler = CopyOnWriteInterruptionHandler(self)
+        hardware.interruptVector.register(COPY_ON_WRITE_INTERRUPTION_TYPE,copyOnWriteHandler)
+       
+        ## controls the Hardware's I/O Device
+        self._ioDeviceController = IoDeviceController(hardware.ioDevice)
+             
+
+    @property
+    def hardware(self):
+        return self._hardware
+
+    @property
+    def ioDeviceController(self):
+        return self._ioDeviceController
+    
+    def executeBatch (self,batch):
+        programa = batch
+        for x in  programa:
+             self.run(x) 
+
+
+    ## un frame para cargar una pagina: si no hay libres se desaloja una
+    def frameLibre(self):
+        if self.memoryManager.framesLibres() > 0:
+            return self.memoryManager.allocFrames(1)[0]
+        return self.seleccionDeVictima.desalojar()
+
+    ## escribe los cambios de estado en el archivo a medida que corre la simulacion
+    def exportarEventos(self, path, formato=EXPORTAR_CSV):
+        self.exportador = ExportadorDeEventos(self.gantt, path, formato)
+        self.pcbTable.addSubscriber(self.exportador)
+        return self.exportador
+
+    ## emulates a "system call" for programs execution
+    def run(self, path,prioridad):
+        New = IRQ(NEW_INTERRUPTION_TYPE,{"path":path,"prioridad":prioridad})
+        self.hardware.interruptVector.handle(New)
+
+
+
+    def __repr__(self):
+        return "Kernel "
+## emulates a (very) basic File System: guarda los programas por path
+class FileSystem():
+    def __init__(self):
+        self._archivos = {}
+
+    def write(self, path, program):
+        self._archivos[path] = program
+
+    def read(self, path):
+        return self._archivos[path]
+
+
+## administra los frames libres de la memoria fisica
+## los frames libres se guardan en una pila (pedir o liberar N frames cuesta
+## O(N), sin importar el tamaño de la memoria) y un bitmap marca los ocupados
+class MemoryManager():
+    def __init__(self, cantidadDeFrames):
+        self._framesLibres = list(range(cantidadDeFrames - 1, -1, -1))
+        self._ocupados = bytearray(cantidadDeFrames)
+
+    ## pide "cantidad" frames de una sola vez
+    def allocFrames(self, cantidad):
+        if cantidad > len(self._framesLibres):
+            raise Exception("Not enough memory: {cantidad} frames requested, {libres} free".format(cantidad = cantidad, libres = len(self._framesLibres)))
+        if cantidad == 0:
+            return []
+        frames = self._framesLibres[-cantidad:]
+        del self._framesLibres[-cantidad:]
+        frames.reverse()
+        for frameId in frames:
+            self._ocupados[frameId] = 1
+        return frames
+
+    ## libera todos los frames de una sola vez
+    def freeFrames(self, frames):
+        frames = list(frames)
+        for frameId in frames:
+            if not self._ocupados[frameId]:
+                raise Exception("Frame {frameId} is already free".format(frameId = frameId))
+            self._ocupados[frameId] = 0
+        frames.reverse()
+        self._framesLibres.extend(frames)
+
+    def framesLibres(self):
+        return len(self._framesLibres)
+
+    def isFree(self, frameId):
+        return not self._ocupados[frameId]
+
+
+## administra los frames con el sistema buddy: cada pedido se redondea a
+## una potencia de 2 y se sirve con un bloque de frames contiguos.
+## Hay una lista de bloques libres por orden (tamaño 2^orden); partir un
+## bloque o unirlo con su buddy al liberarlo cuesta O(log n).
+## Tiene la misma interfaz que MemoryManager (allocFrames/freeFrames).
+class BuddyMemoryManager():
+    def __init__(self, cantidadDeFrames):
+        self._cantidadDeFrames = cantidadDeFrames
+        self._libres = [set() for orden in range(0, max(1, cantidadDeFrames.bit_length()))]
+        self._framesLibres = 0
+        ## bloques asignados: inicio -> [orden, frames pedidos, frames que siguen en uso]
+        self._bloques = dict()
+        ## frame entregado -> inicio de su bloque
+        self._bloqueDe = dict()
+        self._desperdicio = 0
+        ## partimos la memoria en los bloques alineados mas grandes posibles
+        inicio = 0
+        while inicio < cantidadDeFrames:
+            orden = len(self._libres) - 1
+            while inicio % (1 << orden) != 0 or inicio + (1 << orden) > cantidadDeFrames:
+                orden -= 1
+            self._liberarBloque(inicio, orden)
+            inicio += 1 << orden
+
+    ## pide "cantidad" frames contiguos
+    def allocFrames(self, cantidad):
+        if cantidad == 0:
+            return []
+        orden = (cantidad - 1).bit_length()
+        inicio = self._tomarBloque(orden)
+        if inicio is None:
+            raise Exception("Not enough memory: no block of {cantidad} frames, {libres} free".format(cantidad = cantidad, libres = self._framesLibres))
+        self._bloques[inicio] = [orden, cantidad, cantidad]
+        self._desperdicio += (1 << orden) - cantidad
+        frames = list(range(inicio, inicio + cantidad))
+        for frameId in frames:
+            self._bloqueDe[frameId] = inicio
+        return frames
+
+    ## libera frames entregados; un bloque vuelve a estar libre cuando se
+    ## liberaron todos sus frames (pueden liberarse en distintos llamados)
+    def freeFrames(self, frames):
+        for frameId in frames:
+            try:
+                inicio = self._bloqueDe.pop(frameId)
+            except KeyError:
+                raise Exception("Frame {frameId} is already free".format(frameId = frameId))
+            bloque = self._bloques[inicio]
+            bloque[2] -= 1
+            if bloque[2] == 0:
+                orden, pedidos, vivos = self._bloques.pop(inicio)
+                self._desperdicio -= (1 << orden) - pedidos
+                self._liberarBloque(inicio, orden)
+
+    def framesLibres(self):
+        return self._framesLibres
+
+    def isFree(self, frameId):
+        for orden in range(0, len(self._libres)):
+            if (frameId >> orden << orden) in self._libres[orden]:
+                return True
+        return False
+
+    ## el bloque libre mas grande (en frames)
+    def mayorBloqueLibre(self):
+        for orden in range(len(self._libres) - 1, -1, -1):
+            if self._libres[orden]:
+                return 1 << orden
+        return 0
+
+    ## frames asignados que no se usan por el redondeo a potencia de 2
+    def fragmentacionInterna(self):
+        return self._desperdicio
+
+    ## que parte de los frames libres no esta en el mayor bloque libre
+    def fragmentacionExterna(self):
+        if self._framesLibres == 0:
+            return 0
+        return 1 - self.mayorBloqueLibre() / self._framesLibres
+
+    def _tomarBloque(self, orden):
+        actual = orden
+        while actual < len(self._libres) and not self._libres[actual]:
+            actual += 1
+        ## tambien cuando el orden pedido es mayor que el del bloque mas grande
+        if actual >= len(self._libres):
+            return None
+        inicio = self._libres[actual].pop()
+        self._framesLibres -= 1 << actual
+        ## partimos el bloque: la mitad de arriba queda libre en el orden de abajo
+        while actual > orden:
+            actual -= 1
+            self._libres[actual].add(inicio + (1 << actual))
+            self._framesLibres += 1 << actual
+        return inicio
+
+    def _liberarBloque(self, inicio, orden):
+        self._framesLibres += 1 << orden
+        ## mientras el buddy este libre, los unimos en un bloque del orden siguiente
+        while orden < len(self._libres) - 1:
+            buddy = inicio ^ (1 << orden)
+            if buddy not in self._libres[orden]:
+                break
+            self._libres[orden].remove(buddy)
+            inicio = min(inicio, buddy)
+            orden += 1
+        self._libres[orden].add(inicio)
+
+    def __repr__(self):
+        filas = [[orden, 1 << orden, len(libres)] for orden, libres in enumerate(self._libres)]
+        return tabulate(filas, headers=['Orden', 'Frames', 'Bloques libres'], tablefmt='psql')
+
+
+## los procesos que corren el mismo programa (mismo path) comparten los frames
+## de sus paginas. Cada frame compartido lleva la lista de procesos que lo usan y
+## se libera cuando termina el ultimo. Los frames compartidos son de solo lectura:
+## el que escribe se queda con una copia propia (ver CopyOnWriteInterruptionHandler)
+class Loader():
+    def __init__ (self, memoryManager, hardware):
+        self._memoryManager = memoryManager
+        self._hardware = hardware
+        ## (path, pageId) -> frameId
+        self._compartidos = dict()
+        ## frameId -> {pid: pcb} de los procesos que lo tienen en su page table
+        self._usuarios = dict()
+
+    ## carga todas las paginas del programa en la page table del pcb (las que
+    ## ya estan en memoria se comparten) y devuelve las que tuvo que cargar
+    def load (self, program, pcb):
+        frameSize = self._hardware.mmu.frameSize
+        progSize = len(program.instructions)
+        cantidadDePaginas = (progSize + frameSize - 1) // frameSize
+        nuevas = [pageId for pageId in range(0, cantidadDePaginas) if self.compartir(pcb, pageId) is None]
+        frames = self._memoryManager.allocFrames(len(nuevas))
+        cargadas = dict()
+        for pageId, frameId in zip(nuevas, frames):
+            self.loadPage(program, pageId, frameId)
+            self.registrar(pcb, pageId, frameId)
+            cargadas[pageId] = frameId
+        return cargadas
+
+    ## si la pagina ya esta en memoria la agrega a la page table del pcb
+    ## y devuelve su frame, si no devuelve None
+    def compartir (self, pcb, pageId):
+        frameId = self._compartidos.get((pcb.programPath, pageId))
+        if frameId is not None:
+            self._usuarios[frameId][pcb.pid] = pcb
+            pcb.pageTable[pageId] = frameId
+        return frameId
+
+    ## una pagina recien cargada del programa queda disponible para compartir
+    ## y su frame de solo lectura (hasta que alguien escriba)
+    def registrar (self, pcb, pageId, frameId):
+        self._hardware.mmu.setReadOnly(frameId, True)
+        self._compartidos[(pcb.programPath, pageId)] = frameId
+        self._usuarios[frameId] = {pcb.pid: pcb}
+        pcb.pageTable[pageId] = frameId
+
+    ## el pcb va a modificar la pagina: deja de compartirla. Devuelve los procesos
+    ## que siguen usando el frame; si no queda ninguno la pagina ya no se comparte
+    def separar (self, pcb, pageId, frameId):
+        usuarios = self._usuarios[frameId]
+        del usuarios[pcb.pid]
+        if not usuarios:
+            del self._usuarios[frameId]
+            del self._compartidos[(pcb.programPath, pageId)]
+        return list(usuarios.values())
+
+    ## los procesos que usan el frame (vacio si no es compartido)
+    def usuarios (self, frameId):
+        return list(self._usuarios.get(frameId, dict()).values())
+
+    ## el pcb termino: devuelve los frames que ya no usa nadie
+    def soltar (self, pcb):
+        libres = []
+        for pageId, frameId in pcb.pageTable.items():
+            usuarios = self._usuarios.get(frameId)
+            if usuarios is None:
+                ## pagina propia (se trajo del swap)
+                libres.append(frameId)
+                continue
+            del usuarios[pcb.pid]
+            if not usuarios:
+                del self._usuarios[frameId]
+                del self._compartidos[(pcb.programPath, pageId)]
+                libres.append(frameId)
+        return libres
+
+    ## la pagina del frame fue desalojada: deja de estar compartida.
+    ## Devuelve los procesos que la tenian (vacio si no era compartida)
+    def desalojado (self, frameId, pcb, pageId):
+        usuarios = self._usuarios.pop(frameId, None)
+        if usuarios is None:
+            return []
+        del self._compartidos[(pcb.programPath, pageId)]
+        return list(usuarios.values())
+
+    ## copia una pagina del programa a su frame de una sola vez
+    def loadPage (self, program, pageId, frameId):
+        frameSize = self._hardware.mmu.frameSize
+        page = memoryview(program.code)[pageId * frameSize:(pageId + 1) * frameSize]
+        self._hardware.memory.write_block(frameId * frameSize, page)
+
+
+class PCB():
+    __slots__ = ('pageTable', 'programPath', 'size', 'pid', 'pc', '_state', '_pcbTable', 'prioridad', 'swap')
+
+    def __init__(self,pageTable,path,prioridad,size):
+        self.pageTable = pageTable
+        self.programPath = path
+        self.size = size
+        self.pid = 0
+        self.pc = 0
+        self._state = NEW
+        ## la PCBTable que lleva la cuenta de los estados (None hasta que se carga)
+        self._pcbTable = None
+        self.prioridad = prioridad
+        ## paginas modificadas que fueron desalojadas (pageId -> contenido)
+        self.swap = dict()
+
+    @property
+    def state(self):
+        return self._state
+
+    ## los cambios de estado pasan por la PCBTable para mantener sus indices
+    @state.setter
+    def state(self, estado):
+        if self._pcbTable is None:
+            self._state = estado
+        else:
+            self._pcbTable.cambiarEstado(self, estado)
+
+    def __repr__(self):
+        return "pid {} pageTable {} pc {} state {} programPath {}".format(self.pid,self.pageTable,self.pc,self.state,self.programPath)
+
+## ademas de los PCBs por pid, guarda el proceso en RUNNING y los pids que hay
+## en cada estado, asi las consultas por estado no recorren toda la tabla
+class PCBTable():
+    def __init__(self):
+        self.procesos = {}
+        self.pid = 0 
+        self._running = None
+        self._porEstado = {estado: set() for estado in ESTADOS}
+        self._subscribers = []
+    
+    def __repr__(self):
+        return tabulate(enumerate(self.procesos), tablefmt='psql')
+
+    ## los subscribers reciben cambioDeEstado(pcb, estado) cuando se carga un PCB
+    ## y en cada cambio de estado
+    def addSubscriber(self, subscriber):
+        self._subscribers.append(subscriber)
+
+    def _notificar(self, pcb, estado):
+        for subscriber in self._subscribers:
+            subscriber.cambioDeEstado(pcb, estado)
+
+    def cagarPcb(self,pcb):
+        pidNuevo = self.pid
+        self.procesos[pidNuevo] = pcb
+        pcb.pid = self.pid
+        self.pid +=1
+        pcb._pcbTable = self
+        self._porEstado[pcb.state].add(pcb.pid)
+        if pcb.state == RUNNING:
+            self._running = pcb
+        self._notificar(pcb, pcb.state)
+        return pcb
+
+    ## el unico lugar donde cambia el estado de un PCB de la tabla
+    def cambiarEstado(self, pcb, estado):
+        self._porEstado[pcb.state].discard(pcb.pid)
+        self._porEstado[estado].add(pcb.pid)
+        pcb._state = estado
+        if estado == RUNNING:
+            self._running = pcb
+        elif self._running is pcb:
+            self._running = None
+        self._notificar(pcb, estado)
+
+    def pcbEnRunning (self):
+        return self._running
+
+    ## cuantos procesos hay en el estado
+    def cantidad (self, estado):
+        return len(self._porEstado[estado])
+
+    ## los pids de los procesos en el estado (una copia: el indice cambia con cada cambio de estado)
+    def pids (self, estado):
+        return frozenset(self._porEstado[estado])
+
+    def todosLosProcesosTerminaron (self):
+        return len(self._porEstado[TERMINATED]) == len(self.procesos)
+                
+    
+## PCBTable que guarda los procesos por columnas: un array por campo, indexado
+## por pid, en lugar de un objeto por proceso. El kernel usa PCBColumnar, que son
+## vistas sobre las columnas; solo se guardan las de los procesos que no terminaron.
+## Las consultas sobre todos los procesos se hacen sobre las columnas (con numpy si esta).
+## Cuando un proceso termina su page table y su swap se reemplazan por un mapping
+## vacio compartido, asi los procesos terminados no ocupan mas que sus columnas
+class PCBTablaColumnar(PCBTable):
+    SIN_PAGINAS = MappingProxyType(dict())
+
+    def __init__(self):
+        super().__init__()
+        self.procesos = ProcesosColumnar(self)
+        ## las consultas por estado salen de la columna de estados, alcanza con contarlos
+        self._porEstado = None
+        self._cantidades = {estado: 0 for estado in ESTADOS}
+        self._vistas = dict()
+        self._pc = array('q')
+        self._size = array('q')
+        self._estado = array('b')
+        self._prioridad = array('q')
+        self._programPath = []
+        self._pageTable = []
+        self._swap = []
+
+    def cagarPcb(self,pcb):
+        pid = self.pid
+        pcb.pid = pid
+        self._pc.append(pcb.pc)
+        self._size.append(pcb.size)
+        self._estado.append(ESTADOS.index(pcb.state))
+        self._prioridad.append(pcb.prioridad)
+        self._programPath.append(pcb.programPath)
+        self._pageTable.append(pcb.pageTable)
+        self._swap.append(pcb.swap)
+        self.pid += 1
+        self._cantidades[pcb.state] += 1
+        vista = PCBColumnar(self, pid)
+        if pcb.state != TERMINATED:
+            self._vistas[pid] = vista
+        if pcb.state == RUNNING:
+            self._running = vista
+        self._notificar(vista, pcb.state)
+        return vista
+
+    def cambiarEstado(self, pcb, estado):
+        self._cantidades[pcb.state] -= 1
+        self._cantidades[estado] += 1
+        pcb._state = estado
+        if estado == RUNNING:
+            self._running = pcb
+        elif self._running is pcb:
+            self._running = None
+        if estado == TERMINATED:
+            self._vistas.pop(pcb.pid, None)
+            self._pageTable[pcb.pid] = self.SIN_PAGINAS
+            self._swap[pcb.pid] = self.SIN_PAGINAS
+        self._notificar(pcb, estado)
+
+    ## el PCB del pid (siempre la misma vista mientras el proceso no termine)
+    def vista(self, pid):
+        if not 0 <= pid < self.pid:
+            raise KeyError(pid)
+        vista = self._vistas.get(pid)
+        return vista if vista is not None else PCBColumnar(self, pid)
+
+    def cantidad (self, estado):
+        return self._cantidades[estado]
+
+    def pids (self, estado):
+        codigo = ESTADOS.index(estado)
+        if numpy is not None:
+            return frozenset(numpy.flatnonzero(numpy.frombuffer(self._estado, dtype=numpy.int8) == codigo).tolist())
+        return frozenset(pid for pid, codigoPid in enumerate(self._estado) if codigoPid == codigo)
+
+    ## la menor prioridad (la mas urgente) de los procesos en el estado, None si no hay ninguno
+    def prioridadMinima (self, estado):
+        if self._cantidades[estado] == 0:
+            return None
+        codigo = ESTADOS.index(estado)
+        if numpy is not None:
+            estados = numpy.frombuffer(self._estado, dtype=numpy.int8)
+            return int(numpy.frombuffer(self._prioridad, dtype=numpy.int64)[estados == codigo].min())
+        return min(prioridad for prioridad, codigoPid in zip(self._prioridad, self._estado) if codigoPid == codigo)
+
+    def todosLosProcesosTerminaron (self):
+        return self._cantidades[TERMINATED] == self.pid
+
+## los procesos de una PCBTablaColumnar como diccionario pid -> PCB
+class ProcesosColumnar(Mapping):
+    def __init__(self, tabla):
+        self._tabla = tabla
+
+    def __getitem__(self, pid):
+        return self._tabla.vista(pid)
+
+    def __iter__(self):
+        return iter(range(0, self._tabla.pid))
+
+    def __len__(self):
+        return self._tabla.pid
+
+## un PCB de una PCBTablaColumnar: lee y escribe las columnas de su pid
+class PCBColumnar():
+    __slots__ = ('_tabla', 'pid')
+
+    def __init__(self, tabla, pid):
+        self._tabla = tabla
+        self.pid = pid
+
+    @property
+    def pc(self):
+        return self._tabla._pc[self.pid]
+
+    @pc.setter
+    def pc(self, pc):
+        self._tabla._pc[self.pid] = pc
+
+    @property
+    def size(self):
+        return self._tabla._size[self.pid]
+
+    @property
+    def programPath(self):
+        return self._tabla._programPath[self.pid]
+
+    @property
+    def pageTable(self):
+        return self._tabla._pageTable[self.pid]
+
+    @property
+    def swap(self):
+        return self._tabla._swap[self.pid]
+
+    @property
+    def prioridad(self):
+        return self._tabla._prioridad[self.pid]
+
+    @property
+    def _state(self):
+        return ESTADOS[self._tabla._estado[self.pid]]
+
+    @_state.setter
+    def _state(self, estado):
+        self._tabla._estado[self.pid] = ESTADOS.index(estado)
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, estado):
+        self._tabla.cambiarEstado(self, estado)
+
+    def __repr__(self):
+        return "pid {} pageTable {} pc {} state {} programPath {}".format(self.pid,self.pageTable,self.pc,self.state,self.programPath)
+
+class Dispatcher():
+
+    def __init__(self, hardware):
+        self._hardware = hardware
+
+    def load(self, pcb):
+        self._hardware.cpu.pc = pcb.pc
+        ## la TLB no se vacia: alcanza con cambiar el address space activo
+        self._hardware.mmu.pageTable = pcb.pageTable
+        self._hardware.mmu.asid = pcb.pid
+        self._hardware.mmu.limit = pcb.size - 1
+        self._hardware.timer.reset()
+        pcb.state = RUNNING
+    
+    def save(self, pcb):
+        pcb.pc = self._hardware.cpu.pc
+        self._hardware.cpu.pc = -1
+
+## guarda, para cada proceso, los cambios de estado como (fila, estado): el estado
+## vale desde esa fila hasta el proximo cambio. En cada tick solo se cuenta una fila
+## mas; la tabla con el estado de todos los procesos en cada tick se arma en __repr__
+class Gantt():
+   
+    def __init__(self,kernel):
+        self._filas = 0
+        ## pid -> [(fila, estado)]
+        self._cambios = dict()
+        self._kernel = kernel
+   
+    def tick (self,tickNbr):
+        log.logger.info("guardando informacion de los estados de los PCBs en el tick N {}".format(tickNbr))
+        self._filas += 1
+
+    ## el Gantt no genera eventos, solo registra
+    def nextEventTick(self, tickNbr):
+        return None
+
+    ## en los ticks salteados nadie cambia de estado: son filas iguales a la anterior
+    def skipTicks(self, fromTick, toTick):
+        self._filas += toTick - fromTick
+
+    ## el nuevo estado se ve a partir de la proxima fila; si el proceso ya habia
+    ## cambiado antes de esa fila, vale el ultimo cambio
+    def cambioDeEstado(self, pcb, estado):
+        cambios = self._cambios.setdefault(pcb.pid, [])
+        if cambios and cambios[-1][0] == self._filas:
+            cambios.pop()
+        if not cambios or cambios[-1][1] != estado:
+            cambios.append((self._filas, estado))
+
+    @property
+    def ticks(self):
+        return self._filas
+
+    ## los pids de los procesos que aparecen en el Gantt
+    def pids(self):
+        return list(self._cambios)
+
+    ## los intervalos (desde, hasta, estado) del proceso; "hasta" no se incluye
+    def intervalos(self, pid):
+        cambios = self._cambios.get(pid, [])
+        for indice, (desde, estado) in enumerate(cambios):
+            hasta = cambios[indice + 1][0] if indice + 1 < len(cambios) else self._filas
+            if desde < hasta:
+                yield (desde, hasta, estado)
+
+    ## el estado de cada proceso en cada tick (un diccionario pid -> estado por fila)
+    def filas(self):
+        cambios = sorted((fila, pid, estado) for pid, cambiosPid in self._cambios.items() for fila, estado in cambiosPid)
+        pcbYEstado = dict()
+        indice = 0
+        for fila in range(0, self._filas):
+            while indice < len(cambios) and cambios[indice][0] == fila:
+                pcbYEstado[cambios[indice][1]] = cambios[indice][2]
+                indice += 1
+            yield dict(pcbYEstado)
+
+    def __repr__(self):
+        return tabulate(enumerate(self.filas()), tablefmt='grid')
+
+## algoritmos de seleccion de victima para la paginacion bajo demanda
+## (ver parcial/mem_virtual y parcial/pagefault)
+class SeleccionDeVictima():
+
+    def __init__(self, kernel):
+        self.kernel = kernel
+        ## frames ocupados (frameId -> (pcb, pageId)), en orden de carga
+        self._frames = OrderedDict()
+
+    def cargado(self, frameId, pcb, pageId):
+        self._frames[frameId] = (pcb, pageId)
+        self.kernel.hardware.mmu.frameLoaded(frameId)
+
+    def liberados(self, frameIds):
+        for frameId in frameIds:
+            self._frames.pop(frameId, None)
+
+    ## un frame compartido sigue en uso: pasa a otro de los procesos que lo usan
+    def reasignado(self, frameId, pcbViejo, pcbNuevo):
+        pcb, pageId = self._frames.get(frameId, (None, None))
+        if pcb is pcbViejo:
+            self._frames[frameId] = (pcbNuevo, pageId)
+
+    def victima(self):
+        log.logger.error("-- VICTIMA MUST BE OVERRIDEN in class {classname}".format(classname=self.__class__.__name__))
+
+    ## elige una victima, la saca de la page table de los procesos que la usan
+    ## y devuelve el frame libre
+    def desalojar(self):
+        log.logger.info(self)
+        frameId = self.victima()
+        pcb, pageId = self._frames.pop(frameId)
+        usuarios = self.kernel.loader.desalojado(frameId, pcb, pageId) or [pcb]
+        modificada = self.kernel.hardware.mmu.modified(frameId)
+        if modificada:
+            frameSize = self.kernel.hardware.mmu.frameSize
+            contenido = self.kernel.hardware.memory.read_block(frameId * frameSize, frameSize).tolist()
+        for usuario in usuarios:
+            if modificada:
+                ## la pagina fue modificada: la guardamos en el swap del proceso
+                usuario.swap[pageId] = array(MEMORY_TYPECODE, contenido)
+            del usuario.pageTable[pageId]
+            self.kernel.hardware.mmu.invalidatePage(usuario.pid, pageId)
+        log.logger.info(" Victima: pid {pid} page {pageId} frame {frameId}".format(pid=pcb.pid, pageId=pageId, frameId=frameId))
+        return frameId
+
+    ## la tabla de frames como en parcial/mem_virtual
+    def __repr__(self):
+        mmu = self.kernel.hardware.mmu
+        filas = []
+        for frameId, (pcb, pageId) in self._frames.items():
+            filas.append([frameId, pcb.pid, pageId, mmu.loadTime(frameId), mmu.lastReference(frameId), int(mmu.referenced(frameId)), int(mmu.modified(frameId))])
+        return tabulate(filas, headers=['Frame', 'PID', 'Pagina', 'T Carga', 'Ultima Referencia', 'R', 'M'], tablefmt='pipe')
+
+class VictimaFIFO(SeleccionDeVictima):
+
+    ## la pagina que se cargo primero
+    def victima(self):
+        return next(iter(self._frames))
+
+class VictimaLRU(SeleccionDeVictima):
+
+    ## la pagina cuya ultima referencia es la mas vieja
+    def victima(self):
+        return min(self._frames, key=self.kernel.hardware.mmu.lastReference)
+
+class VictimaSegundaChance(SeleccionDeVictima):
+
+    ## FIFO, pero si la pagina fue referenciada se le borra el bit
+    ## y pasa al final de la cola (como si se hubiera cargado recien)
+    def victima(self):
+        while True:
+            frameId = next(iter(self._frames))
+            if not self.kernel.hardware.mmu.referenced(frameId):
+                return frameId
+            self.kernel.hardware.mmu.clearReferenced(frameId)
+            self._frames.move_to_end(frameId)
+
+class VictimaNRU(SeleccionDeVictima):
+
+    ## la primera pagina (en orden de carga) de la clase mas baja:
+    ## 0 = (R=0, M=0), 1 = (R=0, M=1), 2 = (R=1, M=0), 3 = (R=1, M=1)
+    def victima(self):
+        mmu = self.kernel.hardware.mmu
+        victima = None
+        claseVictima = 4
+        for frameId in self._frames:
+            clase = 2 * mmu.referenced(frameId) + mmu.modified(frameId)
+            if clase < claseVictima:
+                victima = frameId
+                claseVictima = clase
+                if clase == 0:
+                    break
+        return victima
+
+class VictimaOptima(SeleccionDeVictima):
+
+    ## la pagina que mas tarda en volver a usarse. Como los programas se
+    ## ejecutan en forma secuencial, una pagina que quedo atras del PC de su
+    ## proceso no se vuelve a usar, y las demas se usan cuando el PC llegue a ellas
+    def victima(self):
+        frameSize = self.kernel.hardware.mmu.frameSize
+        victima = None
+        distanciaVictima = -1
+        for frameId, (pcb, pageId) in self._frames.items():
+            pc = self.kernel.hardware.cpu.pc if pcb.state == RUNNING else pcb.pc
+            if (pageId + 1) * frameSize <= pc:
+                distancia = float('inf')
+            else:
+                distancia = max(0, pageId * frameSize - pc)
+            if distancia > distanciaVictima:
+                victima = frameId
+                distanciaVictima = distancia
+        return victima
+
+## borra los bits R de todos los frames cada "periodo" ticks (0 = desactivado)
+class ResetBitsDeReferencia():
+
+    def __init__(self, hardware):
+        self._hardware = hardware
+        self._periodo = 0
+
+    @property
+    def periodo(self):
+        return self._periodo
+
+    @periodo.setter
+    def periodo(self, periodo):
+        self._periodo = periodo
+
+    def tick(self, tickNbr):
+        if self._periodo and tickNbr % self._periodo == 0:
+            self._hardware.mmu.clearReferencedBits()
+
+    ## el borrado es un evento: el clock no lo puede saltear
+    def nextEventTick(self, tickNbr):
+        if not self._periodo:
+            return None
+        return -(-tickNbr // self._periodo) * self._periodo
+
+    def skipTicks(self, fromTick, toTick):
+        pass
+
+## escribe cada cambio de estado (tick, pid, estado, programa) en un archivo CSV o
+## JSON Lines mientras corre la simulacion. Los registros se juntan en un buffer de
+## "tamanioDeBuffer" registros que se escribe cuando se llena y al cerrar, asi la
+## memoria no crece con la duracion de la corrida. El tick de un cambio es la fila
+## del Gantt desde la que vale (se lee del Gantt, asi coinciden aunque el exportador
+## se agregue en medio de la corrida). Los cambios de un proceso dentro de un mismo
+## tick se juntan como en el Gantt: queda el ultimo, y no se escribe si deja al
+## proceso en el estado que ya tenia. Una vez cerrado se ignoran los cambios
+class ExportadorDeEventos():
+    CAMPOS = ('tick', 'pid', 'estado', 'programa')
+
+    def __init__(self, gantt, path, formato=EXPORTAR_CSV, tamanioDeBuffer=4096):
+        if formato not in (EXPORTAR_CSV, EXPORTAR_JSONL):
+            raise Exception("Unknown export format {formato}".format(formato = formato))
+        self._gantt = gantt
+        self._formato = formato
+        self._tamanioDeBuffer = tamanioDeBuffer
+        self._buffer = []
+        ## cambios del tick actual que todavia pueden pisarse: pid -> (estado, programa)
+        self._pendientes = dict()
+        self._tick = None
+        ## ultimo estado escrito de cada proceso
+        self._estados = dict()
+        self._registros = 0
+        self._archivo = open(path, 'w', newline='')
+        if formato == EXPORTAR_CSV:
+            self._csv = csv.writer(self._archivo)
+            self._csv.writerow(self.CAMPOS)
+
+    @property
+    def registros(self):
+        return self._registros
+
+    def cambioDeEstado(self, pcb, estado):
+        if self._archivo.closed:
+            return
+        if self._gantt.ticks != self._tick:
+            self._cerrarTick()
+            self._tick = self._gantt.ticks
+        self._pendientes[pcb.pid] = (estado, pcb.programPath)
+
+    ## pasa al buffer los cambios del tick que termino
+    def _cerrarTick(self):
+        for pid, (estado, programa) in self._pendientes.items():
+            if self._estados.get(pid) != estado:
+                self._estados[pid] = estado
+                self._buffer.append((self._tick, pid, estado, programa))
+                self._registros += 1
+        self._pendientes = dict()
+        if len(self._buffer) >= self._tamanioDeBuffer:
+            self.flush()
+
+    ## escribe los registros de los ticks ya terminados
+    def flush(self):
+        if self._formato == EXPORTAR_CSV:
+            self._csv.writerows(self._buffer)
+        else:
+            self._archivo.write("".join(json.dumps(dict(zip(self.CAMPOS, registro))) + "\n" for registro in self._buffer))
+        self._buffer = []
+        self._archivo.flush()
+
+    def cerrar(self):
+        if not self._archivo.closed:
+            self._cerrarTick()
+            self.flush()
+            self._archivo.close()
+
+## cola de listos FIFO (FCFS y Round Robin)
+class readyQueve():
+    def __init__(self):
+        self.pcbs = deque()
+    def agregar (self,pcb):
+        pcb.state = READY
+        self.pcbs.append(pcb)
+    def sacar (self):
+        return self.pcbs.popleft()
+
+    def elementosDeLista(self):
+        return list(self.pcbs)
+
+    def __len__(self):
+        return len(self.pcbs)
+
+## cola de listos ordenada por prioridad (menor numero = mas prioridad), con un heap:
+## agregar y sacar cuestan O(log n). Entre procesos de igual prioridad sale primero
+## el que llego ultimo, como cuando se insertaba delante de los de igual prioridad
+class readyQueveConPrioridad():
+    def __init__(self):
+        self.pcbs = []
+        self._orden = 0
+    def agregar (self,pcb):
+        pcb.state = READY
+        self._orden += 1
+        heapq.heappush(self.pcbs, (pcb.prioridad, -self._orden, pcb))
+    def sacar (self):
+        return heapq.heappop(self.pcbs)[2]
+
+    def elementosDeLista(self):
+        return [pcb for prioridad, orden, pcb in sorted(self.pcbs, key=lambda entrada: entrada[:2])]
+
+    def __len__(self):
+        return len(self.pcbs)
+
+class Schaduler():
+    
+    def __init__(self,kernel):
+        self.readyQueve = self.nuevaReadyQueve()
+        self.kernel = kernel
+    def nuevaReadyQueve(self):
+        return readyQueve()
+    def add (self):
+        pass
+    def expropiar(self,pcb):
+        pass
+    def next (self):
+        return self.readyQueve.sacar()
+    def hayElementosEnReadyQueve(self):
+        return len(self.readyQueve) >= 1
+    def enColarOrdenado(self,pcb):
+        self.readyQueve.agregar(pcb)
+
+class FCFS(Schaduler):
+
+    def add (self,pcb):
+        if self.kernel.pcbTable.pcbEnRunning() == None:
+            self.kernel.dispatcher.load(pcb)
+        else:
+            self.readyQueve.agregar(pcb)
+
+
+class PrioridadNoExpropiativa(Schaduler):
+    def nuevaReadyQueve(self):
+        return readyQueveConPrioridad()
+
+    def add (self,pcb):
+
+        if  self.kernel.pcbTable.pcbEnRunning() == None:
+            self.kernel.dispatcher.load(pcb)
+        else:
+            self.enColarOrdenado(pcb)
+
+class PrioridadExpropiativa(Schaduler):
+    def nuevaReadyQueve(self):
+        return readyQueveConPrioridad()
+
+    def add (self,pcb):
+        if  self.kernel.pcbTable.pcbEnRunning() == None:
+            self.kernel.dispatcher.load(pcb)
+        else:
+            self.expropiar(pcb)
+
+    def expropiar(self,pcb):
+        pcbCorriendo = self.kernel.pcbTable.pcbEnRunning()
+       
+        if(pcb.prioridad < pcbCorriendo.prioridad):
+            self.kernel.dispatcher.save(pcbCorriendo)
+            self.enColarOrdenado(pcbCorriendo)
+            self.kernel.dispatcher.load(pcb)
+        else:
+            self.enColarOrdenado(pcb)
+    
+class Roundribin(Schaduler):
+    def add (self,pcb):
+        if self.kernel.pcbTable.pcbEnRunning() == None:
+            self.kernel.dispatcher.load(pcb)
+        else:
+            self.readyQueve.agregar(pcb)
+    def expropiar(self,pcb):
+        if self.kernel.schaduler.hayElementosEnReadyQueve():
+            if self.kernel.pcbTable.pcbEnRunning() != None:
+                pcbCorriendo = self.kernel.pcbTable.pcbEnRunning()
+                self.kernel.dispatcher.save(pcbCorriendo)
+                self.add(pcbCorriendo)
+                elSiguinete = self.next()
+                self.kernel.dispatcher.load(elSiguinete)
\ No newline at end of file
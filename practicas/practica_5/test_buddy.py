@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+
+import unittest
+
+from so import BuddyMemoryManager
+
+
+class BuddyMemoryManagerTest(unittest.TestCase):
+
+    ## con 6 frames los bloques libres son de 4 y de 2 frames
+    def setUp(self):
+        self.memoryManager = BuddyMemoryManager(6)
+
+    def test_pedido_que_entra_en_el_mayor_bloque(self):
+        self.assertEqual(self.memoryManager.allocFrames(3), [0, 1, 2])
+        self.assertEqual(self.memoryManager.framesLibres(), 2)
+
+    def test_pedido_sin_bloque_libre_del_orden_pedido(self):
+        with self.assertRaisesRegex(Exception, "Not enough memory"):
+            self.memoryManager.allocFrames(7)
+
+    ## el orden pedido (16 frames) es mayor que el de cualquier bloque de la memoria
+    def test_pedido_mayor_que_el_mayor_bloque(self):
+        with self.assertRaisesRegex(Exception, "Not enough memory"):
+            self.memoryManager.allocFrames(9)
+        self.assertEqual(self.memoryManager.framesLibres(), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
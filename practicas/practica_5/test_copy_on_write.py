@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+import logging
+import unittest
+
+import log
+from hardware import *
+from so import *
+
+
+class CopyOnWriteTest(unittest.TestCase):
+
+    ## dos procesos del mismo programa, con las paginas cargadas (y compartidas)
+    def setUp(self):
+        log.logger.setLevel(logging.WARNING)
+        self.hardware = Hardware()
+        self.hardware.setup(64, CLOCK_TURBO)
+        self.kernel = Kernel(self.hardware)
+        self.kernel.demandPaging = False
+        self.kernel.schaduler = FCFS(self.kernel)
+        self.kernel.fileSystem.write("c:/prg.exe", Program("prg.exe", [ASM.CPU(6)]))
+        self.kernel.run("c:/prg.exe", 1)
+        self.kernel.run("c:/prg.exe", 1)
+        self.escritor = self.kernel.pcbTable.pcbEnRunning()
+        self.otro = [pcb for pcb in self.kernel.pcbTable.procesos.values() if pcb is not self.escritor][0]
+
+    def celda(self, pcb, logicalAddress):
+        frameId = pcb.pageTable[logicalAddress // FRAME_SIZE]
+        return self.hardware.memory.read(frameId * FRAME_SIZE + logicalAddress % FRAME_SIZE)
+
+    def test_escribir_una_pagina_compartida_no_cambia_la_del_otro_proceso(self):
+        frameCompartido = self.otro.pageTable[0]
+        self.assertEqual(self.escritor.pageTable[0], frameCompartido)
+        original = self.celda(self.otro, 1)
+
+        self.hardware.mmu.write(1, 99)
+
+        self.assertNotEqual(self.escritor.pageTable[0], frameCompartido)
+        self.assertEqual(self.celda(self.escritor, 1), 99)
+        self.assertEqual(self.otro.pageTable[0], frameCompartido)
+        self.assertEqual(self.celda(self.otro, 1), original)
+        self.assertTrue(self.hardware.mmu.modified(self.escritor.pageTable[0]))
+        self.assertFalse(self.hardware.mmu.modified(frameCompartido))
+
+    ## el ultimo proceso que usa la pagina la escribe en el lugar
+    def test_el_unico_usuario_escribe_en_su_frame(self):
+        self.hardware.mmu.write(1, 99)
+        self.kernel.dispatcher.save(self.escritor)
+        self.escritor.state = READY
+        self.kernel.dispatcher.load(self.otro)
+        frameId = self.otro.pageTable[0]
+
+        self.hardware.mmu.write(2, 77)
+
+        self.assertEqual(self.otro.pageTable[0], frameId)
+        self.assertEqual(self.celda(self.otro, 2), 77)
+        self.assertFalse(self.hardware.mmu.readOnly(frameId))
+
+
+if __name__ == '__main__':
+    unittest.main()